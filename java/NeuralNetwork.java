@@ -1,4 +1,5 @@
 import java.io.*;
+import java.util.Arrays;
 import java.util.Random;
 import java.util.UUID;
 import java.util.concurrent.*;
@@ -226,6 +227,90 @@ public class NeuralNetwork implements Serializable {
         System.out.println("Training complete!");
     }
     
+    /**
+     * Incremental accumulator for sample-weighted model averaging (FedAvg).
+     *
+     * Partial models are added one at a time and can be discarded right
+     * after, so averaging holds one running sum plus the current model
+     * instead of every partial model at once.
+     */
+    public static class WeightAccumulator {
+        private NeuralNetwork acc;
+        private double total;
+
+        public void add(NeuralNetwork m, double samples) {
+            if (acc == null) {
+                acc = new NeuralNetwork(m.inputSize, m.hiddenSize, m.outputSize);
+                zero(acc.weightsInputHidden);
+                zero(acc.weightsHiddenOutput);
+                Arrays.fill(acc.biasHidden, 0);
+                Arrays.fill(acc.biasOutput, 0);
+            } else if (m.inputSize != acc.inputSize || m.hiddenSize != acc.hiddenSize
+                    || m.outputSize != acc.outputSize) {
+                throw new IllegalArgumentException("Architecture mismatch: " + m + " vs " + acc);
+            }
+            accumulate(acc.weightsInputHidden, m.weightsInputHidden, samples);
+            accumulate(acc.weightsHiddenOutput, m.weightsHiddenOutput, samples);
+            for (int i = 0; i < acc.biasHidden.length; i++) {
+                acc.biasHidden[i] += samples * m.biasHidden[i];
+            }
+            for (int i = 0; i < acc.biasOutput.length; i++) {
+                acc.biasOutput[i] += samples * m.biasOutput[i];
+            }
+            total += samples;
+        }
+
+        /** Normalize the running sum and return the averaged network. */
+        public NeuralNetwork finish() {
+            if (acc == null || total == 0) {
+                throw new IllegalStateException("no models accumulated");
+            }
+            scale(acc.weightsInputHidden, 1.0 / total);
+            scale(acc.weightsHiddenOutput, 1.0 / total);
+            for (int i = 0; i < acc.biasHidden.length; i++) {
+                acc.biasHidden[i] /= total;
+            }
+            for (int i = 0; i < acc.biasOutput.length; i++) {
+                acc.biasOutput[i] /= total;
+            }
+            return acc;
+        }
+    }
+
+    /**
+     * Build a new network whose parameters are the sample-weighted mean of
+     * the given partial models. All models must share the same architecture.
+     */
+    public static NeuralNetwork averageOf(NeuralNetwork[] models, double[] sampleCounts) {
+        WeightAccumulator acc = new WeightAccumulator();
+        for (int m = 0; m < models.length; m++) {
+            acc.add(models[m], sampleCounts[m]);
+        }
+        return acc.finish();
+    }
+
+    private static void zero(double[][] a) {
+        for (double[] row : a) {
+            Arrays.fill(row, 0);
+        }
+    }
+
+    private static void accumulate(double[][] acc, double[][] src, double w) {
+        for (int i = 0; i < acc.length; i++) {
+            for (int j = 0; j < acc[i].length; j++) {
+                acc[i][j] += w * src[i][j];
+            }
+        }
+    }
+
+    private static void scale(double[][] a, double w) {
+        for (int i = 0; i < a.length; i++) {
+            for (int j = 0; j < a[i].length; j++) {
+                a[i][j] *= w;
+            }
+        }
+    }
+
     /**
      * Save model to file
      */
@@ -0,0 +1,157 @@
+import java.io.*;
+
+/**
+ * Training Daemon - long-lived JVM driven by the Python worker
+ *
+ * Spawning a JVM per TRAIN/PREDICT pays cold start and JIT warmup on every
+ * request; this daemon is started once at worker boot and serves commands
+ * over stdin/stdout for the lifetime of the worker, so the training loops
+ * run against warm JIT.
+ *
+ * Protocol (one tab-separated line per command, one line per response):
+ *   PING                                              -> OK
+ *   TRAIN <inputs.csv> <outputs.csv> <epochs> <model_path>
+ *                                                     -> OK <model_id> | ERR <message>
+ *   TRAIN_DATA <n> <in_dim> <out_dim> <epochs> <model_path>
+ *     followed by n*in_dim + n*out_dim little-endian float32 on the same
+ *     stream (inputs block then outputs block); no temp CSV files involved
+ *                                                     -> OK <model_id> | ERR <message>
+ *   AVERAGE <model_out> <model1> <samples1> [<model2> <samples2> ...]
+ *     sample-weighted mean of the partial models' weights (FedAvg)
+ *                                                     -> OK <model_id> | ERR <message>
+ *   PREDICT <model_path> <v1,v2,...>                  -> OK <p1,p2,...> | ERR <message>
+ *
+ * All library logging (training progress etc.) is redirected to stderr so
+ * it cannot corrupt the protocol stream.
+ */
+public class TrainingDaemon {
+
+    public static void main(String[] args) throws IOException {
+        PrintStream proto = System.out;
+        // keep NeuralNetwork's progress prints away from the protocol stream
+        System.setOut(System.err);
+
+        DataInputStream in = new DataInputStream(new BufferedInputStream(System.in));
+        String line;
+        while ((line = readLine(in)) != null) {
+            if (line.isEmpty()) continue;
+            String resp;
+            try {
+                resp = dispatch(line, in);
+            } catch (Exception e) {
+                resp = "ERR\t" + e;
+            }
+            proto.println(resp);
+            proto.flush();
+        }
+    }
+
+    private static String dispatch(String line, DataInputStream in) throws Exception {
+        String[] parts = line.split("\t");
+        String cmd = parts[0].toUpperCase();
+
+        if (cmd.equals("PING")) {
+            return "OK";
+        }
+
+        if (cmd.equals("TRAIN")) {
+            if (parts.length < 5) return "ERR\tusage: TRAIN <inputs> <outputs> <epochs> <model_path>";
+            double[][] inputs = TrainingModule.loadCsv(parts[1]);
+            double[][] outputs = TrainingModule.loadCsv(parts[2]);
+            int epochs = Integer.parseInt(parts[3]);
+            String modelPath = parts[4];
+            return train(inputs, outputs, epochs, modelPath);
+        }
+
+        if (cmd.equals("TRAIN_DATA")) {
+            if (parts.length < 6) return "ERR\tusage: TRAIN_DATA <n> <in_dim> <out_dim> <epochs> <model_path>";
+            int n = Integer.parseInt(parts[1]);
+            int inDim = Integer.parseInt(parts[2]);
+            int outDim = Integer.parseInt(parts[3]);
+            int epochs = Integer.parseInt(parts[4]);
+            String modelPath = parts[5];
+            double[][] inputs = readMatrix(in, n, inDim);
+            double[][] outputs = readMatrix(in, n, outDim);
+            return train(inputs, outputs, epochs, modelPath);
+        }
+
+        if (cmd.equals("AVERAGE")) {
+            if (parts.length < 4 || parts.length % 2 != 0) {
+                return "ERR\tusage: AVERAGE <model_out> <model1> <samples1> [...]";
+            }
+            // streamed running mean: each partial model is loaded, folded
+            // into the accumulator and released before the next one
+            int k = (parts.length - 2) / 2;
+            NeuralNetwork.WeightAccumulator acc = new NeuralNetwork.WeightAccumulator();
+            for (int i = 0; i < k; i++) {
+                acc.add(NeuralNetwork.load(parts[2 + 2 * i]),
+                        Double.parseDouble(parts[3 + 2 * i]));
+            }
+            NeuralNetwork avg = acc.finish();
+            avg.save(parts[1]);
+            return "OK\t" + avg.getModelId();
+        }
+
+        if (cmd.equals("PREDICT")) {
+            if (parts.length < 3) return "ERR\tusage: PREDICT <model_path> <v1,v2,...>";
+            NeuralNetwork nn = NeuralNetwork.load(parts[1]);
+            String[] vals = parts[2].split(",");
+            double[] input = new double[vals.length];
+            for (int i = 0; i < vals.length; i++) {
+                input[i] = Double.parseDouble(vals[i].trim());
+            }
+            double[] output = nn.predict(input);
+            StringBuilder sb = new StringBuilder("OK\t");
+            for (int i = 0; i < output.length; i++) {
+                if (i > 0) sb.append(',');
+                sb.append(String.format("%.6f", output[i]));
+            }
+            return sb.toString();
+        }
+
+        return "ERR\tunknown command: " + cmd;
+    }
+
+    private static String train(double[][] inputs, double[][] outputs, int epochs, String modelPath) throws Exception {
+        if (inputs.length != outputs.length) {
+            return "ERR\tinputs/outputs sample count mismatch";
+        }
+        int hiddenSize = Math.max(4, (inputs[0].length + outputs[0].length) / 2);
+        NeuralNetwork nn = new NeuralNetwork(inputs[0].length, hiddenSize, outputs[0].length);
+        nn.train(inputs, outputs, epochs);
+        nn.save(modelPath);
+        return "OK\t" + nn.getModelId();
+    }
+
+    /**
+     * Read a rows*cols float32 (little-endian) block from the stream.
+     */
+    private static double[][] readMatrix(DataInputStream in, int rows, int cols) throws IOException {
+        byte[] raw = new byte[rows * cols * 4];
+        in.readFully(raw);
+        java.nio.FloatBuffer fb = java.nio.ByteBuffer.wrap(raw)
+            .order(java.nio.ByteOrder.LITTLE_ENDIAN).asFloatBuffer();
+        double[][] m = new double[rows][cols];
+        for (int i = 0; i < rows; i++) {
+            for (int j = 0; j < cols; j++) {
+                m[i][j] = fb.get();
+            }
+        }
+        return m;
+    }
+
+    /**
+     * Read one line of bytes from the (binary-capable) stream.
+     * BufferedReader is avoided on purpose: later commands may be followed
+     * by raw binary payloads on the same stream.
+     */
+    private static String readLine(InputStream in) throws IOException {
+        ByteArrayOutputStream buf = new ByteArrayOutputStream();
+        int b;
+        while ((b = in.read()) != -1) {
+            if (b == '\n') return buf.toString("UTF-8");
+            buf.write(b);
+        }
+        return buf.size() > 0 ? buf.toString("UTF-8") : null;
+    }
+}
@@ -29,6 +29,9 @@ public class TrainingModule {
                 case "predict":
                     handlePredict(args);
                     break;
+                case "average":
+                    handleAverage(args);
+                    break;
                 case "demo":
                     runXorDemo();
                     break;
@@ -51,6 +54,9 @@ public class TrainingModule {
         System.out.println("  predict <model.bin> <value1,value2,...>");
         System.out.println("      Load a model and make a prediction");
         System.out.println();
+        System.out.println("  average <model_out.bin> <model1.bin> <samples1> [<model2.bin> <samples2> ...]");
+        System.out.println("      Merge partial models into one by sample-weighted weight averaging");
+        System.out.println();
         System.out.println("  demo");
         System.out.println("      Run XOR demonstration (no files needed)");
     }
@@ -135,6 +141,28 @@ public class TrainingModule {
         System.out.println();
     }
     
+    /**
+     * Handle weight-averaging command (aggregation of partial chunk models)
+     */
+    private static void handleAverage(String[] args) throws Exception {
+        if (args.length < 4 || args.length % 2 != 0) {
+            System.err.println("Usage: average <model_out.bin> <model1.bin> <samples1> [...]");
+            return;
+        }
+        int k = (args.length - 2) / 2;
+        NeuralNetwork.WeightAccumulator acc = new NeuralNetwork.WeightAccumulator();
+        for (int i = 0; i < k; i++) {
+            acc.add(NeuralNetwork.load(args[2 + 2 * i]),
+                    Double.parseDouble(args[3 + 2 * i]));
+        }
+
+        NeuralNetwork avg = acc.finish();
+        avg.save(args[1]);
+
+        System.out.println("MODEL_ID:" + avg.getModelId());
+        System.out.println("MODEL_PATH:" + args[1]);
+    }
+
     /**
      * XOR demonstration - proves the network can learn non-linear patterns
      */
@@ -186,9 +214,9 @@ public class TrainingModule {
     }
     
     /**
-     * Load CSV file into 2D array
+     * Load CSV file into 2D array (package-visible so TrainingDaemon can reuse it)
      */
-    private static double[][] loadCsv(String path) throws IOException {
+    static double[][] loadCsv(String path) throws IOException {
         List<double[]> rows = new ArrayList<>();
         
         try (BufferedReader br = new BufferedReader(new FileReader(path))) {
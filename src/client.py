@@ -1,28 +1,48 @@
 import socket
-import json
 import argparse
 import os
 import time
 
+from src import netproto
 
-def send_file(host: str, port: int, filepath: str):
+
+def send_file_over(sock, filepath: str):
+    """Send one PUT over an already-open framed connection and return the
+    response dict.
+
+    The worker serves framed requests until the client closes, so bulk
+    uploaders can reuse one connection instead of paying a TCP handshake
+    and slow-start per file. The caller owns the socket."""
     fname = os.path.basename(filepath)
+    size = os.stat(filepath).st_size
     with open(filepath, 'rb') as f:
-        data = f.read()
+        netproto.send_msg(sock, {'type': 'PUT', 'filename': fname, 'size': size})
+        sock.sendfile(f)
+    return netproto.recv_msg(sock)
+
+
+def send_file(host: str, port: int, filepath: str):
+    fname = os.path.basename(filepath)
+    size = os.stat(filepath).st_size
 
-    header = json.dumps({'filename': fname, 'size': len(data)})
+    header = {'type': 'PUT', 'filename': fname, 'size': size}
     attempt = 0
     cur_host, cur_port = host, port
     while attempt < 3:
         try:
-            with socket.create_connection((cur_host, cur_port), timeout=10) as s:
-                s.sendall(header.encode('utf-8'))
-                s.sendall(data)
-                resp = s.recv(4096)
+            # prefers the worker's AF_UNIX endpoint when local, else TCP
+            with netproto.connect(cur_host, cur_port, timeout=10) as s, \
+                    open(filepath, 'rb') as f:
+                # framed header first, then the raw payload (its size is in
+                # the header, so no delimiter is needed). sendfile() streams
+                # straight from the page cache, so the file is never read
+                # into this process.
+                netproto.send_msg(s, header)
+                s.sendfile(f)
                 try:
-                    obj = json.loads(resp.decode('utf-8'))
-                except Exception:
-                    print('Response (raw):', resp)
+                    obj = netproto.recv_msg(s)
+                except Exception as e:
+                    print('Response error:', e)
                     return
                 if obj.get('status') == 'OK':
                     print('Uploaded to', cur_host, cur_port)
@@ -35,6 +55,11 @@ def send_file(host: str, port: int, filepath: str):
                         print('Redirecting to leader', cur_host, cur_port)
                         attempt += 1
                         continue
+                    # election still in progress: retry the same node shortly
+                    print('No leader known yet, retrying')
+                    attempt += 1
+                    time.sleep(1.0)
+                    continue
                 print('Server response:', obj)
                 return
         except Exception as e:
@@ -1,5 +1,4 @@
 import time
-import threading
 import asyncio
 
 
@@ -10,21 +9,6 @@ def phase_work(phase_id: int, duration: float = 1.0):
     print(f"[Phase {phase_id}] fin")
 
 
-def run_phases_threaded(phases=None):
-    """Ejecuta fases en hilos (simultáneo)."""
-    if phases is None:
-        phases = [(1, 1.0), (2, 1.5), (3, 0.8)]
-
-    threads = []
-    for pid, dur in phases:
-        t = threading.Thread(target=phase_work, args=(pid, dur), daemon=False)
-        threads.append(t)
-        t.start()
-
-    for t in threads:
-        t.join()
-
-
 async def phase_work_async(phase_id: int, duration: float = 1.0):
     print(f"[Phase {phase_id}] inicio (async, duracion={duration}s)")
     await asyncio.sleep(duration)
@@ -37,3 +21,25 @@ async def run_phases_async(phases=None):
 
     tasks = [asyncio.create_task(phase_work_async(pid, dur)) for pid, dur in phases]
     await asyncio.gather(*tasks)
+
+
+async def run_phases_blocking_async(phases=None):
+    """Ejecuta fases bloqueantes (phase_work) sin bloquear el event loop.
+
+    asyncio.to_thread deriva cada fase al thread pool del loop, de modo que
+    trabajo que libera el GIL corre en paralelo mientras el loop sigue
+    planificando.
+    """
+    if phases is None:
+        phases = [(1, 1.0), (2, 1.5), (3, 0.8)]
+
+    await asyncio.gather(*(asyncio.to_thread(phase_work, pid, dur) for pid, dur in phases))
+
+
+def run_phases_threaded(phases=None):
+    """Compatibilidad: mismo contrato que antes, ahora sobre el event loop.
+
+    Un hilo de SO por fase costaba ~8MB de stack cada uno; las tareas del
+    loop comparten un pool acotado.
+    """
+    asyncio.run(run_phases_blocking_async(phases))
@@ -1,5 +1,12 @@
 import argparse
-from src.concurrency import run_phases_threaded, run_phases_async
+import asyncio
+
+from src.concurrency import run_phases_blocking_async, run_phases_async
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 def main():
@@ -7,10 +14,13 @@ def main():
     parser.add_argument("--mode", choices=["thread","async"], default="thread", help="Modo de concurrencia")
     args = parser.parse_args()
 
+    if uvloop is not None:
+        uvloop.install()
+
     if args.mode == "thread":
-        run_phases_threaded()
+        # las fases bloqueantes corren via asyncio.to_thread sobre el loop
+        asyncio.run(run_phases_blocking_async())
     else:
-        import asyncio
         asyncio.run(run_phases_async())
 
 
@@ -0,0 +1,225 @@
+"""
+Shared wire helpers for the worker/raft/client sockets.
+
+Frames are a 4-byte big-endian length prefix followed by the payload.
+This replaces the old "recv until newline" scanning: both sides know
+exactly how many bytes to read, so receives are a couple of recv_into
+calls into a right-sized buffer instead of a per-chunk substring scan.
+
+The first payload byte of a JSON message is '{' (0x7b), which can never
+be the leading byte of a sane frame length, so servers can sniff the
+first byte and keep accepting the legacy newline-delimited JSON protocol
+from old clients.
+
+Payloads are msgpack when the library is available (3-10x faster than
+JSON and carries bytes natively, so file/model payloads skip base64),
+falling back to JSON otherwise. A msgpack-encoded dict never starts with
+0x7b, so decode() can tell the two apart and mixed peers interoperate.
+"""
+try:
+    # SIMD-accelerated drop-in for the stdlib module; only exercised on the
+    # JSON fallback paths where payload bytes still ride as base64 text
+    import pybase64 as base64
+except ImportError:  # pragma: no cover - optional dependency
+    import base64
+import json
+import os
+import socket
+import struct
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+FRAME_HEADER = struct.Struct('>I')
+
+# refuse absurd frame lengths (also guards against misdetected legacy bytes)
+MAX_FRAME_SIZE = 1 << 30
+
+# socket buffers sized to a typical large AppendEntries batch so sends do
+# not fragment into short writes
+RPC_BUF_SIZE = 262144
+
+
+def uds_path(port: int) -> str:
+    """Filesystem path of a worker's local AF_UNIX endpoint.
+
+    Derived from the worker TCP port so clients can find it without any
+    extra configuration."""
+    return f'/tmp/worker_{port}.sock'
+
+
+def connect(host: str, port: int, timeout=None) -> socket.socket:
+    """Connect to a worker, preferring its AF_UNIX endpoint when the target
+    is this same host (skips loopback TCP framing/checksum overhead and one
+    kernel buffer hop); falls back to plain TCP.
+    """
+    if host in ('127.0.0.1', 'localhost') and hasattr(socket, 'AF_UNIX'):
+        path = uds_path(port)
+        if os.path.exists(path):
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                s.settimeout(timeout)
+                s.connect(path)
+                return s
+            except OSError:
+                s.close()
+    s = socket.create_connection((host, port), timeout=timeout)
+    s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return s
+
+
+def quickack(sock: socket.socket) -> None:
+    """Re-arm TCP_QUICKACK (Linux only; it resets after each segment).
+
+    Delayed ACKs add up to ~40ms to small request/response exchanges, which
+    is fatal for heartbeat-style RPCs."""
+    if hasattr(socket, 'TCP_QUICKACK'):
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        except OSError:
+            pass
+
+
+def tune_rpc_socket(sock: socket.socket) -> None:
+    """Apply the low-latency knobs for small request/response RPC sockets:
+    no Nagle batching, quick ACKs and right-sized kernel buffers."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, RPC_BUF_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RPC_BUF_SIZE)
+    except OSError:
+        pass
+    quickack(sock)
+
+
+def encode(obj) -> bytes:
+    """Serialize a message dict to payload bytes."""
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    if orjson is not None:
+        # parses/serializes several times faster than stdlib json and
+        # works on bytes directly, skipping the utf-8 encode pass
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def decode(data):
+    """Parse payload bytes back into a message dict (msgpack or JSON)."""
+    if data[:1] == b'{':
+        if orjson is not None:
+            return orjson.loads(bytes(data))
+        return json.loads(bytes(data))
+    if msgpack is None:
+        raise ValueError('received msgpack payload but msgpack is not installed')
+    return msgpack.unpackb(bytes(data), raw=False)
+
+
+def encode_array(arr) -> dict:
+    """Describe a 2-D numeric array as {shape, dtype, data} with a raw
+    buffer: 4 bytes per float32 value instead of ~15 chars of JSON text.
+    The buffer rides as bytes under msgpack, base64 text under JSON.
+    """
+    if np is not None and isinstance(arr, np.ndarray):
+        buf = arr.tobytes()
+        shape = list(arr.shape)
+        dtype = str(arr.dtype)
+    else:
+        # plain nested lists: flatten to float32 without numpy
+        flat = []
+        shape = [len(arr), len(arr[0]) if arr and hasattr(arr[0], '__len__') else 1]
+        for row in arr:
+            if hasattr(row, '__len__'):
+                flat.extend(float(x) for x in row)
+            else:
+                flat.append(float(row))
+        buf = struct.pack(f'<{len(flat)}f', *flat)
+        dtype = 'float32'
+    if msgpack is None:
+        buf = base64.b64encode(buf).decode('ascii')
+    return {'shape': shape, 'dtype': dtype, 'data': buf}
+
+
+def decode_array(obj):
+    """Inverse of encode_array. Returns an ndarray when numpy is available,
+    nested Python lists otherwise."""
+    buf = obj['data']
+    if isinstance(buf, str):
+        buf = base64.b64decode(buf)
+    shape = tuple(obj['shape'])
+    dtype = obj.get('dtype', 'float32')
+    if np is not None:
+        return np.frombuffer(buf, dtype=dtype).reshape(shape)
+    if dtype != 'float32':
+        raise ValueError(f'cannot decode dtype {dtype} without numpy')
+    count = len(buf) // 4
+    flat = list(struct.unpack(f'<{count}f', buf))
+    if len(shape) == 1:
+        return flat
+    cols = shape[1]
+    return [flat[i:i + cols] for i in range(0, len(flat), cols)]
+
+
+def recv_exact(sock: socket.socket, n: int) -> bytearray:
+    """Receive exactly n bytes into a preallocated buffer.
+
+    Raises ConnectionError if the peer closes before n bytes arrive.
+    """
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        nread = sock.recv_into(view[got:])
+        if not nread:
+            raise ConnectionError(f'connection closed after {got}/{n} bytes')
+        got += nread
+    return buf
+
+
+def recv_into_exact(sock: socket.socket, view: memoryview) -> None:
+    """Fill an existing memoryview completely from the socket."""
+    got = 0
+    n = len(view)
+    while got < n:
+        nread = sock.recv_into(view[got:])
+        if not nread:
+            raise ConnectionError(f'connection closed after {got}/{n} bytes')
+        got += nread
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket, first_bytes: bytes = b'') -> bytearray:
+    """Read one length-prefixed frame.
+
+    `first_bytes` carries prefix bytes a caller already consumed while
+    sniffing the protocol.
+    """
+    header = bytearray(first_bytes)
+    if len(header) < FRAME_HEADER.size:
+        header += recv_exact(sock, FRAME_HEADER.size - len(header))
+    (length,) = FRAME_HEADER.unpack(bytes(header))
+    if length > MAX_FRAME_SIZE:
+        raise ValueError(f'frame too large: {length}')
+    return recv_exact(sock, length)
+
+
+def send_msg(sock: socket.socket, obj) -> None:
+    send_frame(sock, encode(obj))
+
+
+def recv_msg(sock: socket.socket, first_bytes: bytes = b''):
+    return decode(recv_frame(sock, first_bytes))
@@ -1,12 +1,20 @@
+import asyncio
 import threading
 import socket
 import json
 import time
 import random
-import base64
 import os
+import concurrent.futures
 from typing import List, Tuple
 
+from src import netproto
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
+
 # Minimal Raft-like implementation for log replication (demonstration only).
 # Uses TCP JSON messages terminated by newline for RPCs.
 
@@ -15,6 +23,10 @@ VOTE_RESPONSE = 'VOTE_RESPONSE'
 APPEND_ENTRIES = 'APPEND_ENTRIES'
 APPEND_RESPONSE = 'APPEND_RESPONSE'
 
+# Cap for one AppendEntries batch (serialized bytes). Batching amortizes the
+# per-RPC network and persistence cost when many entries are pending.
+APPEND_BATCH_MAX_BYTES = 1 << 20
+
 
 class RaftNode:
     def __init__(self, node_id: str, host: str, port: int, peers: List[Tuple[str,int]], worker_port: int = None, apply_callback=None, persistence_path: str = None):
@@ -24,6 +36,8 @@ class RaftNode:
         self.peers = peers[:]  # list of (host, port)
         # port where the worker/file-server listens (used for leader redirect)
         self.worker_port = worker_port
+        # identity advertised in AppendEntries; constant for the node lifetime
+        self._advertised_id = [host, worker_port if worker_port is not None else port]
 
         # persistence path for state
         self.persistence_path = persistence_path
@@ -44,7 +58,19 @@ class RaftNode:
         self.state = 'follower'  # follower, candidate, leader
         self.leader = None  # (host, port)
 
-        self.lock = threading.Lock()
+        # bumped on every externally visible change (state/term/leader/
+        # commit/log length) so the monitor can cache its serialized
+        # /status payload until something actually changed
+        self.state_version = 0
+
+        # fine-grained locks so unrelated RPCs do not serialize on one giant
+        # lock. Acquisition order (when nesting): state -> log -> peer.
+        #   _state_lock: current_term / voted_for / state / leader
+        #   _log_lock:   log / commit_index / last_applied / journal marks
+        #   _peer_lock:  next_index / match_index
+        self._state_lock = threading.RLock()
+        self._log_lock = threading.RLock()
+        self._peer_lock = threading.Lock()
         self.election_timer = None
         self.heartbeat_interval = 1.0
         self.stopped = False
@@ -52,43 +78,156 @@ class RaftNode:
         # callback to apply committed log entries to state machine
         self.apply_callback = apply_callback
 
+        # shared pool for vote RPCs and incoming connections; bounds
+        # concurrency and avoids a thread create/destroy per RPC
+        self._exec = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(8, 2 * len(self.peers) + 4), thread_name_prefix='raft')
+
+        # last idle heartbeat per peer: (term, prev_index, commit, monotonic)
+        # used to skip resends when nothing changed very recently
+        self._hb_last_sent = {}
+
+        # one long-lived connection per peer, reused across heartbeats,
+        # AppendEntries and votes; the per-peer lock serializes RPCs on it
+        self._peer_conns = {}
+        self._peer_locks = {p: threading.Lock() for p in self.peers}
+
         # server thread
         self.server_thread = threading.Thread(target=self._serve, daemon=True)
 
         # for waiting replication
         self._replicate_cv = threading.Condition()
 
+        # background persistence: event handlers mark state dirty and the
+        # writer thread coalesces pending changes into one write+fsync
+        self._persist_cv = threading.Condition()
+        self._persist_dirty = False
+
+        # committed entries are applied by a dedicated thread so a slow
+        # apply_callback (file writes, training) cannot stall RPC handling
+        self._apply_cv = threading.Condition()
+
+        # append-only journal bookkeeping: how many log entries are on disk,
+        # the byte offset where each record starts (for truncation), and the
+        # lowest index invalidated by a log conflict since the last write
+        self._journal_fd = None
+        self._journal_len = 0
+        self._journal_offsets = [0]
+        self._persist_trunc = None
+
         # Load persisted state if available
         self._load_state()
 
     def _get_state_file(self):
-        """Get path to state file."""
+        """Get path to the legacy full-state file (pre-journal format)."""
         if self.persistence_path:
             return os.path.join(self.persistence_path, 'raft_state.json')
         return None
 
+    def _get_meta_file(self):
+        if self.persistence_path:
+            return os.path.join(self.persistence_path, 'raft_meta.json')
+        return None
+
+    def _get_journal_file(self):
+        if self.persistence_path:
+            return os.path.join(self.persistence_path, 'raft_journal.bin')
+        return None
+
     def _save_state(self):
-        """Save persistent state (term, votedFor, log) to disk."""
-        state_file = self._get_state_file()
-        if not state_file:
+        """Mark persistent state dirty; the writer thread does the actual I/O.
+
+        Keeping the event path free of disk writes means vote grants and log
+        appends are not stalled behind a full-log rewrite, and several
+        back-to-back changes collapse into a single write+fsync."""
+        with self._persist_cv:
+            self._persist_dirty = True
+            self._persist_cv.notify()
+
+    def _persist_loop(self):
+        while not self.stopped:
+            with self._persist_cv:
+                while not self._persist_dirty and not self.stopped:
+                    self._persist_cv.wait()
+                self._persist_dirty = False
+            if self.stopped:
+                break
+            self._write_state()
+
+    def _write_state(self):
+        """Persist pending changes: append new log entries to the journal
+        (truncating first if a conflict invalidated a suffix) and rewrite the
+        tiny meta file. Appending is O(new entries) instead of the old
+        O(whole log) full rewrite."""
+        meta_file = self._get_meta_file()
+        if not meta_file:
             return
+        with self._state_lock, self._log_lock:
+            term = self.current_term
+            voted_for = self.voted_for
+            log_len = len(self.log)
+            trunc = self._persist_trunc
+            self._persist_trunc = None
+            # the conflict point can lie beyond what the (lagging) writer has
+            # journaled so far; never skip past the on-disk tail or the
+            # entries in between would be lost on replay
+            start = min(trunc, self._journal_len) if trunc is not None else self._journal_len
+            new_entries = list(self.log[start:log_len])
         try:
-            os.makedirs(os.path.dirname(state_file), exist_ok=True)
-            state = {
-                'current_term': self.current_term,
-                'voted_for': self.voted_for,
-                'log': self.log
-            }
-            # Write atomically using temp file
-            temp_file = state_file + '.tmp'
+            os.makedirs(os.path.dirname(meta_file), exist_ok=True)
+            if self._journal_fd is None:
+                self._journal_fd = os.open(
+                    self._get_journal_file(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                # drop any torn tail left by a crash mid-append
+                os.ftruncate(self._journal_fd, self._journal_offsets[-1])
+
+            if trunc is not None and trunc < self._journal_len:
+                os.ftruncate(self._journal_fd, self._journal_offsets[trunc])
+                del self._journal_offsets[trunc + 1:]
+                self._journal_len = trunc
+
+            if new_entries:
+                records = []
+                for entry in new_entries:
+                    blob = netproto.encode(entry)
+                    records.append(netproto.FRAME_HEADER.pack(len(blob)))
+                    records.append(blob)
+                    self._journal_offsets.append(
+                        self._journal_offsets[-1] + netproto.FRAME_HEADER.size + len(blob))
+                os.write(self._journal_fd, b''.join(records))
+                self._journal_len += len(new_entries)
+            os.fsync(self._journal_fd)
+
+            meta = {'current_term': term, 'voted_for': voted_for, 'log_length': log_len}
+            temp_file = meta_file + '.tmp'
             with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(state, f)
-            os.replace(temp_file, state_file)
+                json.dump(meta, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, meta_file)
         except Exception as e:
             print(f"RAFT: Error saving state: {e}")
 
     def _load_state(self):
-        """Load persistent state from disk if available."""
+        """Load persistent state from disk if available.
+
+        Prefers the journal+meta format; falls back to (and migrates from)
+        the legacy single-file raft_state.json.
+        """
+        meta_file = self._get_meta_file()
+        if meta_file and os.path.exists(meta_file):
+            try:
+                with open(meta_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                self.current_term = meta.get('current_term', 0)
+                self.voted_for = meta.get('voted_for', None)
+                log_len = meta.get('log_length', 0)
+                self._replay_journal(log_len)
+                print(f"RAFT: Loaded state from disk (term={self.current_term}, log_len={len(self.log)})")
+            except Exception as e:
+                print(f"RAFT: Error loading state: {e}")
+            return
+
         state_file = self._get_state_file()
         if not state_file or not os.path.exists(state_file):
             return
@@ -98,17 +237,65 @@ class RaftNode:
             self.current_term = state.get('current_term', 0)
             self.voted_for = state.get('voted_for', None)
             self.log = state.get('log', [])
-            print(f"RAFT: Loaded state from disk (term={self.current_term}, log_len={len(self.log)})")
+            print(f"RAFT: Loaded legacy state from disk (term={self.current_term}, log_len={len(self.log)})")
         except Exception as e:
             print(f"RAFT: Error loading state: {e}")
 
+    def _replay_journal(self, log_len):
+        """Rebuild the in-memory log (and record offsets) from the journal,
+        stopping at `log_len` entries or the first torn record."""
+        journal_file = self._get_journal_file()
+        self.log = []
+        self._journal_offsets = [0]
+        if not journal_file or not os.path.exists(journal_file):
+            self._journal_len = 0
+            return
+        hdr_size = netproto.FRAME_HEADER.size
+        with open(journal_file, 'rb') as f:
+            data = f.read()
+        pos = 0
+        while len(self.log) < log_len and pos + hdr_size <= len(data):
+            (length,) = netproto.FRAME_HEADER.unpack(data[pos:pos + hdr_size])
+            end = pos + hdr_size + length
+            if end > len(data):
+                break  # torn tail from a crash mid-append
+            try:
+                self.log.append(netproto.decode(data[pos + hdr_size:end]))
+            except Exception:
+                break
+            pos = end
+            self._journal_offsets.append(pos)
+        self._journal_len = len(self.log)
+
     def start(self):
         self.server_thread.start()
+        threading.Thread(target=self._persist_loop, daemon=True).start()
+        threading.Thread(target=self._apply_loop, daemon=True).start()
         self.reset_election_timeout()
 
 
     def stop(self):
         self.stopped = True
+        loop = getattr(self, '_loop', None)
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(lambda: [t.cancel() for t in asyncio.all_tasks(loop)])
+            except Exception:
+                pass
+        # flush any pending persistent state before going away
+        with self._persist_cv:
+            dirty = self._persist_dirty
+            self._persist_dirty = False
+            self._persist_cv.notify_all()
+        if dirty:
+            self._write_state()
+        for s in list(self._peer_conns.values()):
+            try:
+                s.close()
+            except Exception:
+                pass
+        self._peer_conns.clear()
+        self._exec.shutdown(wait=False)
 
     def reset_election_timeout(self):
         if self.election_timer:
@@ -119,14 +306,17 @@ class RaftNode:
         self.election_timer.start()
 
     def _start_election(self):
-        with self.lock:
+        with self._state_lock:
             self.state = 'candidate'
             self.current_term += 1
             self.voted_for = self.id
+            self.state_version += 1
             self._save_state()  # Persist term and vote
             term = self.current_term
             votes = 1
 
+        votes_lock = threading.Lock()
+
         # send RequestVote to peers
         def ask(peer):
             nonlocal votes
@@ -134,21 +324,15 @@ class RaftNode:
                 msg = {'type': REQUEST_VOTE, 'term': term, 'candidate_id': self.id}
                 resp = self._send_rpc(peer, msg)
                 if resp and resp.get('vote_granted'):
-                    with self.lock:
+                    with votes_lock:
                         votes += 1
             except Exception:
                 pass
 
-        threads = []
-        for p in self.peers:
-            t = threading.Thread(target=ask, args=(p,))
-            t.start()
-            threads.append(t)
-
-        for t in threads:
-            t.join(timeout=2.0)
+        futures = [self._exec.submit(ask, p) for p in self.peers]
+        concurrent.futures.wait(futures, timeout=2.0)
 
-        with self.lock:
+        with self._state_lock, self._log_lock, self._peer_lock:
             if self.state != 'candidate':
                 return
             # total nodes = peers + self
@@ -159,72 +343,183 @@ class RaftNode:
                 # leader should advertise worker port so clients can redirect
                 leader_worker_port = self.worker_port if self.worker_port is not None else self.port
                 self.leader = (self.host, leader_worker_port)
+                self.state_version += 1
                 # initialize leader state
                 for p in self.peers:
                     # next_index initialized to lastLogIndex + 1
                     self.next_index[p] = len(self.log)
                     self.match_index[p] = -1
-                # start heartbeat sender
-                threading.Thread(target=self._leader_loop, daemon=True).start()
+                # start one replication loop per peer (doubles as heartbeat sender)
+                for p in self.peers:
+                    threading.Thread(target=self._replication_loop, args=(p,), daemon=True).start()
             else:
                 # remain follower/candidate and reset timer
                 self.reset_election_timeout()
 
-    def _leader_loop(self):
+    def _replication_loop(self, peer):
+        """Leader-side loop for one peer: ships pending entries in batches and
+        falls back to an empty heartbeat when the log is idle."""
         while not self.stopped and self.state == 'leader':
-            self.send_heartbeats()
-            time.sleep(self.heartbeat_interval)
+            with self._replicate_cv:
+                if self.next_index.get(peer, len(self.log)) >= len(self.log):
+                    # nothing pending; wake up for the next heartbeat or new entries
+                    self._replicate_cv.wait(self.heartbeat_interval)
+            if self.stopped or self.state != 'leader':
+                return
+            if not self._replicate_to_peer(peer):
+                # peer unreachable or log conflict: back off before retrying
+                time.sleep(min(0.2, self.heartbeat_interval))
+
+    def _replicate_to_peer(self, peer):
+        """Send one AppendEntries to `peer` carrying all pending entries (bounded
+        by APPEND_BATCH_MAX_BYTES). Advances next_index optimistically after the
+        send; rolls back on a failed or conflicting ack."""
+        with self._log_lock, self._peer_lock:
+            next_idx = self.next_index.get(peer, len(self.log))
+            batch = []
+            batch_bytes = 0
+            for entry in self.log[next_idx:]:
+                batch.append(entry)
+                batch_bytes += len(netproto.encode(entry))
+                if batch_bytes >= APPEND_BATCH_MAX_BYTES:
+                    break
+            # optimistic advance so a subsequent call can pipeline the next batch
+            self.next_index[peer] = next_idx + len(batch)
+
+        if not batch:
+            # idle heartbeat: skip if an identical one went out a moment ago
+            # (spurious wakeups from commit notifications land here)
+            hb_state = (self.current_term, next_idx - 1, self.commit_index)
+            last = self._hb_last_sent.get(peer)
+            now = time.monotonic()
+            if last is not None and last[:3] == hb_state and now - last[3] < self.heartbeat_interval / 2:
+                return True
+            self._hb_last_sent[peer] = hb_state + (now,)
 
-    def send_heartbeats(self):
-        for p in self.peers:
-            self._send_append_entries(p, [])
+        resp = self._send_append_entries_at(peer, next_idx, batch)
+
+        with self._peer_lock:
+            if resp and resp.get('success'):
+                if batch:
+                    self.match_index[peer] = next_idx + len(batch) - 1
+            else:
+                # undo the optimistic advance and back off one entry to find
+                # the follower's last matching index
+                self.next_index[peer] = max(0, next_idx - 1)
+        if resp and resp.get('success'):
+            if batch:
+                self._advance_commit_index()
+            return True
+        return False
+
+    def _advance_commit_index(self):
+        """Advance commit_index to the highest index replicated on a majority
+        (only for entries from the current term), then apply and wake waiters."""
+        with self._state_lock, self._log_lock, self._peer_lock:
+            if self.state != 'leader':
+                return
+            total = len(self.peers) + 1
+            majority = total // 2 + 1
+            for idx in range(len(self.log) - 1, self.commit_index, -1):
+                if self.log[idx]['term'] != self.current_term:
+                    break
+                count = 1  # leader itself
+                for p in self.peers:
+                    if self.match_index.get(p, -1) >= idx:
+                        count += 1
+                if count >= majority:
+                    self.commit_index = idx
+                    self.state_version += 1
+                    break
+            try:
+                self._apply_committed()
+            except Exception:
+                pass
+        with self._replicate_cv:
+            self._replicate_cv.notify_all()
 
     def _serve(self):
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            s.bind((self.host, self.port))
-            s.listen()
+        """Run the RPC server on a dedicated asyncio event loop.
+
+        Connections are multiplexed cooperatively (epoll via asyncio, uvloop
+        when installed) instead of one OS thread each; the lock-guarded
+        handlers still run on the shared executor so a slow handler cannot
+        stall the I/O plane.
+        """
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+
+        async def main():
+            server = await asyncio.start_server(self._handle_stream, self.host, self.port)
+            async with server:
+                await server.serve_forever()
+
+        try:
+            loop.run_until_complete(main())
+        except (asyncio.CancelledError, RuntimeError):
+            pass
+        finally:
+            loop.close()
+
+    async def _handle_stream(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            netproto.tune_rpc_socket(sock)
+        try:
             while not self.stopped:
+                # framed RPCs start with a length prefix; legacy peers send
+                # newline-delimited JSON starting with '{'
+                first = await reader.read(1)
+                if not first:
+                    return
+                framed = first != b'{'
                 try:
-                    conn, addr = s.accept()
-                    threading.Thread(target=self._handle_conn, args=(conn,), daemon=True).start()
+                    if framed:
+                        rest = await reader.readexactly(netproto.FRAME_HEADER.size - 1)
+                        (length,) = netproto.FRAME_HEADER.unpack(first + rest)
+                        if length > netproto.MAX_FRAME_SIZE:
+                            return
+                        msg = netproto.decode(await reader.readexactly(length))
+                    else:
+                        msg = json.loads((first + await reader.readline()).decode('utf-8').strip())
                 except Exception:
-                    pass
+                    return
 
-    def _handle_conn(self, conn):
-        try:
-            data = b''
-            # read until newline
-            while True:
-                chunk = conn.recv(4096)
-                if not chunk:
-                    break
-                data += chunk
-                if b"\n" in chunk:
-                    break
-            try:
-                msg = json.loads(data.decode('utf-8').strip())
-            except Exception:
-                return
-            typ = msg.get('type')
-            if typ == REQUEST_VOTE:
-                resp = self._handle_request_vote(msg)
-                conn.sendall((json.dumps(resp) + '\n').encode('utf-8'))
-            elif typ == APPEND_ENTRIES:
-                resp = self._handle_append_entries(msg)
-                conn.sendall((json.dumps(resp) + '\n').encode('utf-8'))
-            else:
-                conn.sendall((json.dumps({'error': 'unknown'}) + '\n').encode('utf-8'))
+                typ = msg.get('type')
+                if typ == REQUEST_VOTE:
+                    resp = await loop.run_in_executor(self._exec, self._handle_request_vote, msg)
+                elif typ == APPEND_ENTRIES:
+                    resp = await loop.run_in_executor(self._exec, self._handle_append_entries, msg)
+                else:
+                    resp = {'error': 'unknown'}
+
+                if framed:
+                    payload = netproto.encode(resp)
+                    writer.write(netproto.FRAME_HEADER.pack(len(payload)) + payload)
+                    await writer.drain()
+                    if sock is not None:
+                        netproto.quickack(sock)
+                else:
+                    # legacy connections are one RPC per connection
+                    writer.write((json.dumps(resp) + '\n').encode('utf-8'))
+                    await writer.drain()
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
         finally:
             try:
-                conn.close()
-            except:
+                writer.close()
+            except Exception:
                 pass
 
     def _handle_request_vote(self, msg):
         term = msg.get('term', 0)
         candidate = msg.get('candidate_id')
-        with self.lock:
+        with self._state_lock:
             state_changed = False
             if term > self.current_term:
                 self.current_term = term
@@ -237,6 +532,7 @@ class RaftNode:
                 vote_granted = True
                 state_changed = True
             if state_changed:
+                self.state_version += 1
                 self._save_state()  # Persist term and vote
             self.reset_election_timeout()
         return {'type': VOTE_RESPONSE, 'term': self.current_term, 'vote_granted': vote_granted}
@@ -248,18 +544,24 @@ class RaftNode:
         prev_log_index = msg.get('prev_log_index', -1)
         prev_log_term = msg.get('prev_log_term', 0)
         leader_commit = msg.get('leader_commit', -1)
-        with self.lock:
+        with self._state_lock, self._log_lock:
             state_changed = False
+            version_bump = False
             if term >= self.current_term:
                 if term > self.current_term:
                     self.current_term = term
                     state_changed = True
-                self.state = 'follower'
+                if self.state != 'follower':
+                    self.state = 'follower'
+                    version_bump = True
                 # interpret leader id (may contain worker port)
                 if isinstance(leader_id, list) and len(leader_id) == 2:
-                    self.leader = (leader_id[0], leader_id[1])
+                    new_leader = (leader_id[0], leader_id[1])
                 else:
-                    self.leader = tuple(leader_id) if isinstance(leader_id, (list, tuple)) else leader_id
+                    new_leader = tuple(leader_id) if isinstance(leader_id, (list, tuple)) else leader_id
+                if self.leader != new_leader:
+                    self.leader = new_leader
+                    version_bump = True
 
                 # consistency check: prev_log_index/term must match local log
                 if prev_log_index >= 0:
@@ -273,6 +575,9 @@ class RaftNode:
                 insert_at = prev_log_index + 1
                 if insert_at < len(self.log):
                     self.log = self.log[:insert_at]
+                    # tell the persistence writer the journal suffix is invalid
+                    if self._persist_trunc is None or insert_at < self._persist_trunc:
+                        self._persist_trunc = insert_at
                     state_changed = True
 
                 # append new entries
@@ -284,10 +589,13 @@ class RaftNode:
                 # update commit index
                 if leader_commit > self.commit_index:
                     self.commit_index = min(leader_commit, len(self.log) - 1)
+                    version_bump = True
 
                 # save state if changed
                 if state_changed:
                     self._save_state()
+                if state_changed or version_bump:
+                    self.state_version += 1
 
                 # apply committed entries to state machine if callback provided
                 try:
@@ -301,141 +609,144 @@ class RaftNode:
                 return {'type': APPEND_RESPONSE, 'term': self.current_term, 'success': False}
 
 
+    def _peer_connect(self, peer, timeout):
+        s = socket.create_connection(peer, timeout=timeout)
+        netproto.tune_rpc_socket(s)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        return s
+
     def _send_rpc(self, peer, msg, timeout=2.0):
-        host, port = peer
-        try:
-            with socket.create_connection((host, port), timeout=timeout) as s:
-                s.sendall((json.dumps(msg) + '\n').encode('utf-8'))
-                data = b''
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk:
-                        break
-                    data += chunk
-                    if b"\n" in chunk:
-                        break
-                return json.loads(data.decode('utf-8').strip())
-        except Exception:
-            return None
-
-    def _send_append_entries(self, peer, entries):
-        # send with prevLogIndex/prevLogTerm based on next_index
-        with self.lock:
-            next_idx = self.next_index.get(peer, len(self.log))
+        """Do one framed request/response on the peer's persistent connection.
+
+        Reconnects lazily: a stale or broken socket is dropped and the RPC is
+        retried once on a fresh connection.
+        """
+        plock = self._peer_locks.setdefault(peer, threading.Lock())
+        with plock:
+            for retry in (False, True):
+                s = self._peer_conns.get(peer)
+                try:
+                    if s is None:
+                        s = self._peer_connect(peer, timeout)
+                        self._peer_conns[peer] = s
+                    s.settimeout(timeout)
+                    netproto.send_msg(s, msg)
+                    resp = netproto.recv_msg(s)
+                    # QUICKACK resets after each segment; re-arm for the
+                    # next request/response on this connection
+                    netproto.quickack(s)
+                    return resp
+                except Exception:
+                    self._peer_conns.pop(peer, None)
+                    try:
+                        if s is not None:
+                            s.close()
+                    except Exception:
+                        pass
+                    if retry:
+                        return None
+        return None
+
+    def _send_append_entries_at(self, peer, next_idx, entries):
+        # send with prevLogIndex/prevLogTerm for an explicit log position
+        with self._state_lock, self._log_lock:
+            term = self.current_term
             prev_index = next_idx - 1
             prev_term = self.log[prev_index]['term'] if prev_index >= 0 and prev_index < len(self.log) else 0
             leader_commit = self.commit_index
 
-        msg = {'type': APPEND_ENTRIES, 'term': self.current_term, 'leader_id': [self.host, self.worker_port if self.worker_port is not None else self.port],
+        msg = {'type': APPEND_ENTRIES, 'term': term, 'leader_id': self._advertised_id,
                'entries': entries, 'prev_log_index': prev_index, 'prev_log_term': prev_term, 'leader_commit': leader_commit}
         return self._send_rpc(peer, msg)
 
     def is_leader(self):
-        with self.lock:
+        with self._state_lock:
             return self.state == 'leader'
 
     def replicate(self, command: dict, timeout=5.0):
-        """Append command to log and replicate; return True if committed or raise redirect if not leader."""
-        with self.lock:
-            if not self.is_leader():
+        """Append command to log and wait for it to commit; return True if
+        committed within `timeout` or raise NotLeader with redirect info.
+
+        The actual sending is done by the per-peer replication loops, which
+        batch this entry together with any other pending ones, so concurrent
+        `replicate` calls share RPCs instead of racing each other."""
+        with self._state_lock, self._log_lock, self._peer_lock:
+            if self.state != 'leader':
                 # return leader info if known
                 raise NotLeader(self.leader)
             entry = {'term': self.current_term, 'command': command}
             # append locally (optimistic)
             self.log.append(entry)
+            self.state_version += 1
             self._save_state()  # Persist log change
             my_index = len(self.log) - 1
 
             # ensure next_index exists for peers
             for p in self.peers:
                 if p not in self.next_index:
-                    self.next_index[p] = len(self.log)
+                    self.next_index[p] = my_index
 
+        # wake the replication loops and wait for commit
+        with self._replicate_cv:
+            self._replicate_cv.notify_all()
 
-        # send append_entries to peers and update next_index/match_index
-        acks = 1
-        lock = self.lock
-
-        def send_and_update(peer):
-            nonlocal acks
-            # send entries starting at next_index[peer]
-            while True:
-                with lock:
-                    next_idx = self.next_index.get(peer, len(self.log))
-                    # entries to send
-                    entries_to_send = self.log[next_idx:]
-                resp = self._send_append_entries(peer, entries_to_send)
-                if resp and resp.get('success'):
-                    with lock:
-                        # set match_index and next_index
-                        self.match_index[peer] = my_index
-                        self.next_index[peer] = my_index + 1
-                        acks += 1
-                    break
-                else:
-                    # decrement next_index and retry (backoff)
-                    with lock:
-                        cur = self.next_index.get(peer, len(self.log))
-                        if cur > 0:
-                            self.next_index[peer] = cur - 1
-                        else:
-                            break
-
-        threads = []
-        for p in self.peers:
-            t = threading.Thread(target=send_and_update, args=(p,))
-            t.start()
-            threads.append(t)
-
-        start = time.time()
-        for t in threads:
-            remain = timeout - (time.time() - start)
-            if remain > 0:
-                t.join(remain)
-
-        # check if committed by majority
-        with self.lock:
-            total = len(self.peers) + 1
-            majority = total // 2 + 1
-            # count nodes with match_index >= index
-            count = 1  # leader itself
-            for p in self.peers:
-                if self.match_index.get(p, -1) >= my_index:
-                    count += 1
-            if count >= majority and self.log[my_index]['term'] == self.current_term:
+        if not self.peers:
+            # single-node cluster: commit immediately
+            with self._log_lock:
                 self.commit_index = my_index
-                # apply committed entries locally
+                self.state_version += 1
                 try:
                     self._apply_committed()
                 except Exception:
                     pass
                 return True
-            return False
+
+        deadline = time.time() + timeout
+        with self._replicate_cv:
+            while True:
+                with self._state_lock, self._log_lock:
+                    if self.commit_index >= my_index:
+                        return True
+                    if self.state != 'leader':
+                        raise NotLeader(self.leader)
+                remain = deadline - time.time()
+                if remain <= 0:
+                    return False
+                self._replicate_cv.wait(remain)
 
     def _apply_committed(self):
-        """Apply entries from last_applied+1..commit_index using apply_callback."""
-        if not self.apply_callback:
-            self.last_applied = self.commit_index
-            return
+        """Wake the apply thread; the actual callback work happens there so
+        RPC handlers never block on it."""
+        with self._apply_cv:
+            self._apply_cv.notify()
 
-        # apply in-order
-        while self.last_applied < self.commit_index:
-            self.last_applied += 1
-            entry = None
-            try:
-                entry = self.log[self.last_applied]
-            except Exception:
-                continue
-            try:
-                cmd = entry.get('command') if isinstance(entry, dict) else None
-                if cmd is not None:
-                    # call outside lock to avoid deadlocks
+    def _apply_loop(self):
+        """Apply entries from last_applied+1..commit_index using apply_callback."""
+        while not self.stopped:
+            with self._apply_cv:
+                if self.last_applied >= self.commit_index:
+                    self._apply_cv.wait(1.0)
+                    continue
+
+            with self._log_lock:
+                pending = []
+                while self.last_applied < self.commit_index:
+                    self.last_applied += 1
                     try:
-                        self.apply_callback(cmd)
+                        pending.append(self.log[self.last_applied])
                     except Exception:
                         pass
-            except Exception:
-                pass
+                if not self.apply_callback:
+                    pending = []
+
+            # apply in-order, outside the lock
+            for entry in pending:
+                try:
+                    cmd = entry.get('command') if isinstance(entry, dict) else None
+                    if cmd is not None:
+                        self.apply_callback(cmd)
+                except Exception:
+                    pass
 
 
 class NotLeader(Exception):
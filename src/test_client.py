@@ -6,10 +6,11 @@ Usage:
     python -m src.test_client --host 127.0.0.1 --port 9000 list
 """
 import socket
-import json
 import argparse
 import time
 
+from src import netproto
+
 
 def send_predict_request(host: str, port: int, model_id: str, input_data: list):
     """
@@ -24,33 +25,25 @@ def send_predict_request(host: str, port: int, model_id: str, input_data: list):
     Returns:
         prediction output if successful, None otherwise
     """
-    message = json.dumps({
+    message = {
         'type': 'PREDICT',
         'model_id': model_id,
         'input': input_data
-    })
-    
+    }
+
     attempt = 0
     cur_host, cur_port = host, port
-    
+
     while attempt < 5:
         try:
             with socket.create_connection((cur_host, cur_port), timeout=30) as s:
-                s.sendall((message + '\n').encode('utf-8'))
-                
-                response_data = b''
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk:
-                        break
-                    response_data += chunk
-                    if b'\n' in chunk:
-                        break
-                
+                s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                netproto.send_msg(s, message)
+
                 try:
-                    resp = json.loads(response_data.decode('utf-8').strip())
-                except Exception:
-                    print('Response (raw):', response_data)
+                    resp = netproto.recv_msg(s)
+                except Exception as e:
+                    print('Response error:', e)
                     return None
                 
                 if resp.get('status') == 'OK':
@@ -84,22 +77,13 @@ def send_predict_request(host: str, port: int, model_id: str, input_data: list):
 
 def list_models(host: str, port: int):
     """Request list of available models from worker."""
-    message = json.dumps({'type': 'LIST_MODELS'})
-    
+    message = {'type': 'LIST_MODELS'}
+
     try:
         with socket.create_connection((host, port), timeout=10) as s:
-            s.sendall((message + '\n').encode('utf-8'))
-            
-            response_data = b''
-            while True:
-                chunk = s.recv(4096)
-                if not chunk:
-                    break
-                response_data += chunk
-                if b'\n' in chunk:
-                    break
-            
-            resp = json.loads(response_data.decode('utf-8').strip())
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            netproto.send_msg(s, message)
+            resp = netproto.recv_msg(s)
             
             if resp.get('status') == 'OK':
                 models = resp.get('models', [])
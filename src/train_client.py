@@ -6,12 +6,18 @@ Usage:
     python -m src.train_client --host 127.0.0.1 --port 9000 train-inline "0,0;0,1;1,0;1,1" "0;1;1;0"
 """
 import socket
-import json
 import argparse
 import time
 
+from src import netproto
 
-def send_train_request(host: str, port: int, inputs: list, outputs: list):
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+def send_train_request(host: str, port: int, inputs, outputs):
     """
     Send training data to a worker and receive model ID.
     
@@ -24,35 +30,35 @@ def send_train_request(host: str, port: int, inputs: list, outputs: list):
     Returns:
         model_id if successful, None otherwise
     """
-    message = json.dumps({
-        'type': 'TRAIN',
-        'inputs': inputs,
-        'outputs': outputs
-    })
-    
+    if np is not None and isinstance(inputs, np.ndarray):
+        # binary float32 buffers: ~4 bytes/value on the wire vs ~15 as text
+        message = {
+            'type': 'TRAIN',
+            'inputs_arr': netproto.encode_array(inputs),
+            'outputs_arr': netproto.encode_array(outputs)
+        }
+    else:
+        message = {
+            'type': 'TRAIN',
+            'inputs': inputs,
+            'outputs': outputs
+        }
+
     attempt = 0
     cur_host, cur_port = host, port
-    
+
     while attempt < 5:
         try:
-            with socket.create_connection((cur_host, cur_port), timeout=120) as s:
-                # Send message with newline terminator
-                s.sendall((message + '\n').encode('utf-8'))
-                
-                # Receive response (may take time for training)
-                response_data = b''
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk:
-                        break
-                    response_data += chunk
-                    if b'\n' in chunk:
-                        break
-                
+            # prefers the worker's AF_UNIX endpoint when local, else TCP
+            with netproto.connect(cur_host, cur_port, timeout=120) as s:
+                netproto.send_msg(s, message)
+
+                # Receive response (may take time for training); the frame
+                # length tells us exactly how much to read
                 try:
-                    resp = json.loads(response_data.decode('utf-8').strip())
-                except Exception:
-                    print('Response (raw):', response_data)
+                    resp = netproto.recv_msg(s)
+                except Exception as e:
+                    print('Response error:', e)
                     return None
                 
                 if resp.get('status') == 'OK':
@@ -81,8 +87,10 @@ def send_train_request(host: str, port: int, inputs: list, outputs: list):
     return None
 
 
-def load_csv(filepath: str) -> list:
-    """Load CSV file into list of float lists."""
+def load_csv(filepath: str):
+    """Load CSV file into a float32 array (list of float lists without numpy)."""
+    if np is not None:
+        return np.loadtxt(filepath, delimiter=',', dtype=np.float32, ndmin=2)
     data = []
     with open(filepath, 'r') as f:
         for line in f:
@@ -94,12 +102,14 @@ def load_csv(filepath: str) -> list:
     return data
 
 
-def parse_inline(s: str) -> list:
+def parse_inline(s: str):
     """Parse inline format: '0,0;0,1;1,0' -> [[0,0], [0,1], [1,0]]"""
     rows = []
     for part in s.split(';'):
         row = [float(x.strip()) for x in part.split(',')]
         rows.append(row)
+    if np is not None:
+        return np.asarray(rows, dtype=np.float32)
     return rows
 
 
@@ -13,19 +13,37 @@ Uses RAFT consensus for replication.
 import socket
 import threading
 import os
+import sys
+import array
 import argparse
 import http.server
 import socketserver
 import json
-import base64
+try:
+    import pybase64 as base64  # SIMD drop-in; used on JSON fallback paths
+except ImportError:  # pragma: no cover - optional dependency
+    import base64
+import gc
 import glob
-import re
 import math
-from datetime import datetime
+import time
+from src import netproto
 from src.raft import RaftNode, NotLeader
 import subprocess
 import tempfile
-import uuid
+import secrets
+import queue
+import concurrent.futures
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 STORAGE_DIR = 'worker_storage'
 MODELS_DIR = 'models'
@@ -33,64 +51,335 @@ LOG_FILE = 'worker.log'
 JAVA_DIR = 'java'
 
 
+# when the writer thread is running (started from main()), log lines are
+# queued and appended by that thread through one long-lived file handle;
+# otherwise log() opens the file per call as before
+_LOG_QUEUE = queue.SimpleQueue()
+_LOG_STARTED = False
+
+
+def _log_writer():
+    f = None
+    while True:
+        line = _LOG_QUEUE.get()
+        try:
+            if f is None:
+                os.makedirs(os.path.dirname(LOG_FILE) or '.', exist_ok=True)
+                f = open(LOG_FILE, 'a', encoding='utf-8')
+            f.write(line)
+            # drain everything already queued before the single flush
+            while True:
+                try:
+                    f.write(_LOG_QUEUE.get_nowait())
+                except queue.Empty:
+                    break
+            f.flush()
+        except Exception:
+            f = None  # reopen on the next message
+
+
+def start_log_writer():
+    """Move log-file appends off the request threads (called from main())."""
+    global _LOG_STARTED
+    _LOG_STARTED = True
+    threading.Thread(target=_log_writer, daemon=True).start()
+
+
+# the second-resolution prefix only changes once per second, so cache it and
+# append the microseconds with integer arithmetic instead of building a
+# datetime object per message
+_TS_CACHE = (0, '')
+
+
 def log(msg: str):
-    now = datetime.utcnow().isoformat() 
-    line = f"{now} {msg}\n"
+    global _TS_CACHE
+    t = time.time()
+    sec = int(t)
+    if sec != _TS_CACHE[0]:
+        _TS_CACHE = (sec, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(sec)))
+    line = f"{_TS_CACHE[1]}.{int((t - sec) * 1e6):06d} {msg}\n"
     print(line, end='')
-    parent = os.path.dirname(LOG_FILE) or '.'
-    try:
-        os.makedirs(parent, exist_ok=True)
-    except Exception:
-        pass
+    if _LOG_STARTED:
+        _LOG_QUEUE.put(line)
+        return
     with open(LOG_FILE, 'a', encoding='utf-8') as f:
         f.write(line)
 
 
-class WorkerTCPHandler(threading.Thread):
+# model_id -> model file path, so PREDICT does a dict lookup instead of two
+# glob scans of the models directory per request
+MODEL_INDEX = {}
+MODEL_INDEX_LOCK = threading.Lock()
+
+
+def index_model(model_id, path):
+    with MODEL_INDEX_LOCK:
+        MODEL_INDEX[model_id] = path
+
+
+def load_model_index(models_dir):
+    """Populate MODEL_INDEX with one scan of models_dir (called at startup)."""
+    try:
+        with os.scandir(models_dir) as it:
+            for de in it:
+                if de.name.startswith('model_') and de.name.endswith('.bin'):
+                    MODEL_INDEX[de.name[6:-4]] = de.path
+    except FileNotFoundError:
+        pass
+
+
+# payloads at least this large skip buffered IO and go straight to the fd,
+# saving one memcpy through the stdio buffer per write
+_UNBUFFERED_WRITE_MIN = 256 * 1024
+
+
+def write_file_bytes(path, data):
+    """Write a committed payload to disk in one shot.
+
+    Small files keep buffered IO (one open/write/close is cheap and avoids
+    small-write penalties); large ones use os.open/os.write so the bytes go
+    from the receive buffer to the kernel without an extra copy."""
+    if len(data) >= _UNBUFFERED_WRITE_MIN:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            mv = memoryview(data)
+            while mv:
+                mv = mv[os.write(fd, mv):]
+        finally:
+            os.close(fd)
+        return
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def write_csv(path, rows):
+    """Write training rows to a CSV file in one shot.
+
+    With numpy the whole matrix is formatted by np.savetxt's C loop instead
+    of a Python str() per value and a write per row; rows of scalars are
+    normalized to one column."""
+    if np is not None:
+        arr = np.atleast_2d(np.asarray(rows, dtype=np.float32)).reshape(len(rows), -1)
+        np.savetxt(path, arr, delimiter=',', fmt='%.7g')
+        return
+    lines = []
+    for row in rows:
+        if isinstance(row, (list, tuple)):
+            lines.append(','.join(str(x) for x in row))
+        else:
+            lines.append(str(row))
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def parse_float_csv(s):
+    """Parse 'v1,v2,...' into a list of floats.
+
+    numpy's sep-mode parser runs the whole vector in C; the per-element
+    float() comprehension only remains as the no-numpy fallback."""
+    if np is not None:
+        return np.fromstring(s, dtype=np.float64, sep=',').tolist()
+    return [float(x) for x in s.split(',')]
+
+
+def dumps_indented(obj) -> bytes:
+    """Pretty-printed JSON bytes for the monitor endpoints (orjson when
+    available: emits bytes directly, several times faster than stdlib)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+class JavaEngine:
+    """One persistent JVM running TrainingDaemon for all TRAIN/PREDICT calls.
+
+    Spawning `java` per request paid JVM cold start (hundreds of ms) and JIT
+    warmup every time; the daemon is started once and reused, so hot
+    training loops stay JIT-compiled. One tab-separated command line goes
+    down stdin, one response line comes back; the lock serializes callers
+    on the pipe. If no JVM can be started the engine marks itself
+    unavailable and callers use their fallbacks.
+    """
+
+    def __init__(self, java_dir):
+        self.java_dir = java_dir
+        self.proc = None
+        self.lock = threading.Lock()
+        self.available = True
+
+    def _ensure_proc(self):
+        if self.proc is not None and self.proc.poll() is None:
+            return
+        # binary pipes: TRAIN_DATA ships raw float32 after the command line
+        self.proc = subprocess.Popen(
+            ['java', '-cp', self.java_dir, 'TrainingDaemon'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        threading.Thread(target=self._drain_stderr, args=(self.proc,), daemon=True).start()
+
+    def _drain_stderr(self, proc):
+        """Forward the daemon's logging (training progress etc.) to our log."""
+        try:
+            for line in proc.stderr:
+                line = line.decode('utf-8', errors='replace').strip()
+                if line:
+                    log(f"JAVA: {line}")
+        except Exception:
+            pass
+
+    def call(self, *parts, payload=b''):
+        """Send one command (optionally followed by a raw binary payload),
+        return the tab-split response fields or None."""
+        if not self.available:
+            return None
+        data = ('\t'.join(str(p) for p in parts) + '\n').encode('utf-8') + payload
+        with self.lock:
+            for retry in (False, True):
+                try:
+                    self._ensure_proc()
+                    self.proc.stdin.write(data)
+                    self.proc.stdin.flush()
+                    resp = self.proc.stdout.readline()
+                    if resp:
+                        return resp.decode('utf-8').rstrip('\n').split('\t')
+                except FileNotFoundError:
+                    # no `java` on this host; don't retry every request
+                    self.available = False
+                    log("JavaEngine: java binary not found, engine disabled")
+                    return None
+                except Exception as e:
+                    log(f"JavaEngine error: {e}")
+                # daemon died or gave no answer: restart once
+                try:
+                    if self.proc is not None:
+                        self.proc.kill()
+                except Exception:
+                    pass
+                self.proc = None
+        return None
+
+    def train_data(self, inputs, outputs, epochs, model_path):
+        """Train without the CSV round-trip: the samples go down the pipe as
+        two little-endian float32 blocks right after the header line
+        (~4 bytes per value instead of ~12 of ASCII, and no temp files).
+        Returns the model id or None.
+        """
+        if not self.available or len(inputs) == 0:
+            return None
+        n = len(inputs)
+        if np is not None:
+            # ndarray (or nested-list) input: one C-level cast/copy to
+            # little-endian float32, no per-row Python loop
+            a_in = np.ascontiguousarray(np.asarray(inputs, dtype='<f4')).reshape(n, -1)
+            a_out = np.ascontiguousarray(np.asarray(outputs, dtype='<f4')).reshape(n, -1)
+            in_dim = a_in.shape[1]
+            out_dim = a_out.shape[1]
+            payload = a_in.tobytes() + a_out.tobytes()
+        else:
+            buf_in = array.array('f')
+            for row in inputs:
+                buf_in.extend(row)
+            buf_out = array.array('f')
+            for row in outputs:
+                if isinstance(row, (list, tuple)):
+                    buf_out.extend(row)
+                else:
+                    buf_out.append(float(row))
+            in_dim = len(buf_in) // n
+            out_dim = len(buf_out) // n
+            if sys.byteorder != 'little':  # pragma: no cover - wire is little-endian
+                buf_in.byteswap()
+                buf_out.byteswap()
+            payload = buf_in.tobytes() + buf_out.tobytes()
+        resp = self.call('TRAIN_DATA', n, in_dim, out_dim, epochs, model_path,
+                         payload=payload)
+        if resp and resp[0] == 'OK' and len(resp) > 1:
+            return resp[1]
+        if resp:
+            log(f"Java daemon TRAIN_DATA failed: {resp}")
+        return None
+
+
+# created in main() once JAVA_DIR is known
+JAVA_ENGINE = None
+
+
+# connection-handling pool size and admission limit: a bounded pool
+# amortizes thread creation and caps concurrency; connections beyond the
+# gate are shed instead of queueing without bound
+HANDLER_POOL_SIZE = 32
+HANDLER_BACKLOG = 64
+
+# temp CSVs for the one-shot training fallback go to tmpfs when the host
+# has one: the data is written once, read once by Java and deleted, so it
+# never needs to touch a disk
+TMP_TRAIN_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+# shared pool for SUB_TRAIN fan-out to peers: threads are reused across
+# training rounds instead of created per peer per TRAIN request
+SUB_TRAIN_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=8, thread_name_prefix='subtrain')
+
+
+class WorkerTCPHandler:
     def __init__(self, conn, addr, storage_dir, models_dir, raft_node, peers_info):
-        super().__init__(daemon=True)
         self.conn = conn
         self.addr = addr
         self.storage_dir = storage_dir
+        # destination prefix for PUTs; with keep-alive connections the same
+        # handler stores many files, so join once here instead of per file
+        self.storage_prefix = storage_dir.rstrip(os.sep) + os.sep
         self.models_dir = models_dir
         self.raft_node = raft_node
         self.peers_info = peers_info  # List of (host, port) for worker TCP
+        self.framed = False  # set when the client speaks the framed protocol
 
-    def run(self):
+    def handle(self):
         try:
-            # Read message until newline
-            data = b''
-            while True:
-                chunk = self.conn.recv(4096)
-                if not chunk:
-                    break
-                data += chunk
-                if b'\n' in chunk or len(data) > 1024 * 1024:
-                    break
-
-            if not data:
+            # Sniff the protocol: framed messages start with a 4-byte length
+            # prefix, legacy newline-delimited JSON starts with '{'
+            first = self.conn.recv(1)
+            if not first:
                 return
 
-            # Try to parse as JSON message
-            try:
-                msg = json.loads(data.decode('utf-8').strip())
-                msg_type = msg.get('type', 'PUT')
-            except json.JSONDecodeError:
-                # Legacy format: assume PUT with binary data following header
-                self._handle_legacy_put(data)
+            if first == b'{':
+                # Legacy: read JSON message until newline. Chunks are
+                # collected and joined once at the end; `bytes +=` would
+                # recopy everything received so far on every iteration.
+                parts = [first]
+                total = 1
+                while True:
+                    chunk = self.conn.recv(4096)
+                    if not chunk:
+                        break
+                    parts.append(chunk)
+                    total += len(chunk)
+                    if b'\n' in chunk or total > 1024 * 1024:
+                        break
+                data = b''.join(parts)
+
+                try:
+                    # netproto.decode is orjson-backed for JSON payloads and
+                    # takes the bytes directly (no decode().strip() detour)
+                    msg = netproto.decode(data)
+                except ValueError:
+                    # Legacy format: assume PUT with binary data following header
+                    self._handle_legacy_put(data)
+                    return
+                self._dispatch(msg)
                 return
 
-            # Route to appropriate handler
-            if msg_type == 'TRAIN':
-                self._handle_train(msg)
-            elif msg_type == 'SUB_TRAIN':
-                self._handle_sub_train(msg)
-            elif msg_type == 'PREDICT':
-                self._handle_predict(msg)
-            elif msg_type == 'LIST_MODELS':
-                self._handle_list_models()
-            else:
-                self._send_response({'status': 'ERROR', 'message': f'Unknown type: {msg_type}'})
+            # Framed clients may send several requests over one connection
+            # (keep-alive): serve until the peer closes, saving a TCP
+            # handshake and slow-start per request for bulk uploaders
+            self.framed = True
+            while first:
+                msg = netproto.recv_msg(self.conn, first)
+                self._dispatch(msg)
+                first = self.conn.recv(1)
 
         except Exception as e:
             log(f"Handler error: {e}")
@@ -104,15 +393,65 @@ class WorkerTCPHandler(threading.Thread):
             except:
                 pass
 
+    def _dispatch(self, msg):
+        """Route one parsed request to its handler."""
+        msg_type = msg.get('type', 'PUT')
+        if msg_type == 'PUT':
+            self._handle_put(msg)
+        elif msg_type == 'TRAIN':
+            self._handle_train(msg)
+        elif msg_type == 'SUB_TRAIN':
+            self._handle_sub_train(msg)
+        elif msg_type == 'PREDICT':
+            self._handle_predict(msg)
+        elif msg_type == 'LIST_MODELS':
+            self._handle_list_models()
+        else:
+            self._send_response({'status': 'ERROR', 'message': f'Unknown type: {msg_type}'})
+
     def _send_response(self, obj):
-        self.conn.sendall((json.dumps(obj) + '\n').encode('utf-8'))
+        if self.framed:
+            netproto.send_msg(self.conn, obj)
+        elif orjson is not None:
+            self.conn.sendall(orjson.dumps(obj) + b'\n')
+        else:
+            # compact separators: no space after , and : on every response
+            self.conn.sendall((json.dumps(obj, separators=(',', ':')) + '\n').encode('utf-8'))
+
+    def _handle_put(self, msg):
+        """Handle a framed PUT: header already parsed, payload follows raw."""
+        fname = msg.get('filename')
+        size = int(msg.get('size', 0))
+        if not fname or size < 0:
+            self._send_response({'status': 'ERROR', 'message': 'Missing filename or size'})
+            return
+        log(f"PUT {fname} size={size} from {self.addr}")
+
+        received = netproto.recv_exact(self.conn, size)
+
+        if netproto.msgpack is not None:
+            # msgpack carries bytes natively, so the log entry (and hence the
+            # wire + journal) holds the exact file bytes with no base64 inflation
+            entry = {'filename': fname, 'data': bytes(received)}
+        else:
+            entry = {'filename': fname, 'data_b64': base64.b64encode(received).decode('ascii')}
+        try:
+            success = self.raft_node.replicate(entry)
+            if success:
+                path = self.storage_prefix + fname
+                write_file_bytes(path, received)
+                log(f"Committed and stored {path}")
+                self._send_response({'status': 'OK'})
+            else:
+                self._send_response({'status': 'FAIL'})
+        except NotLeader as nl:
+            self._send_response({'status': 'REDIRECT', 'leader': nl.leader})
 
     def _handle_train(self, msg):
         """Handle TRAIN request: DISTRIBUTED training with data parallelism."""
-        inputs = msg.get('inputs', [])
-        outputs = msg.get('outputs', [])
+        inputs, outputs = self._extract_training_data(msg)
 
-        if not inputs or not outputs:
+        if len(inputs) == 0 or len(outputs) == 0:
             self._send_response({'status': 'ERROR', 'message': 'Missing inputs or outputs'})
             return
 
@@ -146,6 +485,9 @@ class WorkerTCPHandler(threading.Thread):
                 self._send_response({'status': 'ERROR', 'message': 'Training failed'})
                 return
 
+            if model_path:
+                index_model(model_id, model_path)
+
             # ✅ Responder al cliente inmediatamente (evita timeout)
             self._send_response({'status': 'OK', 'model_id': model_id})
 
@@ -158,18 +500,20 @@ class WorkerTCPHandler(threading.Thread):
                 if model_path:
                     with open(model_path, 'rb') as mf:
                         data = mf.read()
-                    data_b64 = base64.b64encode(data).decode('ascii')
                     filename = os.path.basename(model_path)
                     entry = {
                         'action': 'STORE_FILE',
                         'filename': filename,
-                        'data_b64': data_b64,
                         'meta': {
                             'model_id': model_id,
                             'samples': len(inputs),
                             'distributed': num_nodes > 1
                         }
                     }
+                    if netproto.msgpack is not None:
+                        entry['data'] = data
+                    else:
+                        entry['data_b64'] = base64.b64encode(data).decode('ascii')
                 else:
                     raise FileNotFoundError('model file not found')
             except Exception as e:
@@ -196,6 +540,24 @@ class WorkerTCPHandler(threading.Thread):
 
 
 
+    def _extract_training_data(self, msg):
+        """Pull inputs/outputs from a TRAIN-style message. Clients may send
+        either plain nested lists or binary float32 arrays (encode_array).
+
+        With numpy the data is kept (or converted) as one contiguous ndarray
+        end to end, so _split_data chunks become zero-copy views instead of
+        per-chunk list copies."""
+        if 'inputs_arr' in msg:
+            inputs = netproto.decode_array(msg['inputs_arr'])
+            outputs = netproto.decode_array(msg['outputs_arr'])
+        else:
+            inputs = msg.get('inputs', [])
+            outputs = msg.get('outputs', [])
+        if np is not None and not isinstance(inputs, np.ndarray):
+            inputs = np.asarray(inputs, dtype=np.float32)
+            outputs = np.asarray(outputs, dtype=np.float32)
+        return inputs, outputs
+
     def _replicate_entry_safe(self, entry):
         try:
             log(f"Replicating entry via RAFT: {entry}")
@@ -209,59 +571,76 @@ class WorkerTCPHandler(threading.Thread):
     def _distributed_train(self, inputs, outputs, num_nodes):
         """
         🆕 DISTRIBUTED TRAINING: Divide data among nodes
-        
+
         Strategy:
         1. Split data into num_nodes chunks
         2. Send chunks to peers for parallel training
         3. Each node trains its subset
-        4. Aggregate results (here: train final model with all data)
+        4. Aggregate by averaging the partial models' weights (FedAvg,
+           weighted by chunk sample count) - no full-dataset retrain
         """
         # Split data into chunks
         chunks = self._split_data(inputs, outputs, num_nodes)
-        
-        # My chunk (leader trains first chunk)
+
+        # Dispatch peer chunks FIRST so they train while the leader trains
+        # its own chunk; results come back as futures, so there is no shared
+        # results list + lock and per-peer errors surface individually
+        futures = []
+        for i, peer_addr in enumerate(self.peers_info):
+            if i + 1 >= len(chunks):
+                break
+            peer_inputs, peer_outputs = chunks[i + 1]
+            futures.append(SUB_TRAIN_POOL.submit(
+                self._send_train_to_peer, peer_addr, peer_inputs, peer_outputs, i + 1))
+
+        # My chunk (leader trains concurrently with the peers)
         my_inputs, my_outputs = chunks[0]
         log(f"Leader training chunk 0: {len(my_inputs)} samples")
-        
+
         my_model_path = self._train_chunk(my_inputs, my_outputs, chunk_id=0)
-        
+
+        # Collect peer results: (local model path, samples trained on)
+        partial_models = []
+        for f in futures:
+            try:
+                result = f.result(timeout=180)  # 3 minutes max per peer
+            except Exception as e:
+                log(f"SUB_TRAIN dispatch error: {e}")
+                continue
+            if result:
+                partial_models.append(result)
+
         if not my_model_path:
             log("Leader chunk training failed")
             return None
-        
-        partial_models = [my_model_path]
-        
-        # Send chunks to peers for parallel training
-        threads = []
-        results_lock = threading.Lock()
-        
-        for i, peer_addr in enumerate(self.peers_info):
-            if i + 1 >= len(chunks):
-                break
-            
-            peer_inputs, peer_outputs = chunks[i + 1]
-            
-            t = threading.Thread(
-                target=self._send_train_to_peer,
-                args=(peer_addr, peer_inputs, peer_outputs, i+1, partial_models, results_lock)
-            )
-            threads.append(t)
-            t.start()
-        
-        # Wait for all peers to finish training
-        for t in threads:
-            t.join(timeout=180)  # 3 minutes max per peer
-        
+
+        partial_models.append((my_model_path, len(my_inputs)))
+
         log(f"Distributed training complete: {len(partial_models)} partial models")
-        
-        # Aggregate: Train final model with ALL data combined
-        # (This is simpler than averaging weights)
-        return self._aggregate_train(inputs, outputs)
+
+        if len(partial_models) == 1:
+            # every peer failed or timed out: the leader's chunk model is the
+            # only one there is, so promote it instead of averaging (or worse,
+            # retraining on the full dataset)
+            model_id = os.path.basename(my_model_path)[len('model_'):-len('.bin')]
+            log(f"No peer models returned; using leader chunk model {model_id}")
+            return (model_id, my_model_path)
+
+        # Aggregate by weight averaging: the leader never retrains on the
+        # full dataset, so the fan-out actually buys wall time
+        model_id, model_path = self._average_models(partial_models)
+        if model_id:
+            return (model_id, model_path)
+
+        # Averaging unavailable (e.g. no JVM): retrain on all data as before
+        log("Weight averaging unavailable; falling back to full retrain")
+        return self._single_node_train(inputs, outputs)
 
     def _split_data(self, inputs, outputs, num_chunks):
         """
         Split data into chunks for distributed training.
         Uses modulo to distribute remainder samples evenly.
+        ndarray slices are zero-copy views; list inputs fall back to copies.
         
         Examples:
           4 samples, 3 chunks -> [2, 1, 1]
@@ -296,25 +675,23 @@ class WorkerTCPHandler(threading.Thread):
 
     def _train_chunk(self, inputs, outputs, chunk_id):
         """Train a model with a subset of data."""
-        os.makedirs(self.models_dir, exist_ok=True)
-        
-        train_id = f"{uuid.uuid4().hex[:8]}_chunk{chunk_id}"
-        inputs_file = os.path.join(self.models_dir, f'inputs_{train_id}.csv')
-        outputs_file = os.path.join(self.models_dir, f'outputs_{train_id}.csv')
+        train_id = f"{secrets.token_hex(4)}_chunk{chunk_id}"
+        tmp_dir = TMP_TRAIN_DIR or self.models_dir
+        inputs_file = os.path.join(tmp_dir, f'inputs_{train_id}.csv')
+        outputs_file = os.path.join(tmp_dir, f'outputs_{train_id}.csv')
         model_path = os.path.join(self.models_dir, f'model_{train_id}.bin')
 
-        # Write CSV files
+        # Binary fast path: pipe the samples straight to the Java daemon
+        if JAVA_ENGINE is not None:
+            model_id = JAVA_ENGINE.train_data(inputs, outputs, 1000, model_path)
+            if model_id:
+                log(f"Chunk {chunk_id}: Training successful (binary pipe), model_id={model_id}")
+                return model_path
+
+        # Write CSV files (legacy path when the daemon is unavailable)
         try:
-            with open(inputs_file, 'w') as f:
-                for row in inputs:
-                    f.write(','.join(str(x) for x in row) + '\n')
-
-            with open(outputs_file, 'w') as f:
-                for row in outputs:
-                    if isinstance(row, list):
-                        f.write(','.join(str(x) for x in row) + '\n')
-                    else:
-                        f.write(str(row) + '\n')
+            write_csv(inputs_file, inputs)
+            write_csv(outputs_file, outputs)
 
             log(f"Chunk {chunk_id}: Training data saved: {inputs_file}, {outputs_file}")
 
@@ -339,79 +716,108 @@ class WorkerTCPHandler(threading.Thread):
             log(f"Chunk {chunk_id}: Training error: {e}")
             return None
 
-    def _send_train_to_peer(self, peer_addr, inputs, outputs, chunk_id, results_list, lock):
-        """Send SUB_TRAIN request to a peer node."""
+    def _send_train_to_peer(self, peer_addr, inputs, outputs, chunk_id):
+        """Send SUB_TRAIN request to a peer node.
+
+        Returns (local model path, samples) on success, None otherwise."""
         host, port = peer_addr
         
-        msg = {
-            'type': 'SUB_TRAIN',
-            'inputs': inputs,
-            'outputs': outputs,
-            'chunk_id': chunk_id
-        }
+        msg = {'type': 'SUB_TRAIN', 'chunk_id': chunk_id}
+        if np is not None and isinstance(inputs, np.ndarray):
+            # binary float32 buffers: 4 bytes per value on the wire instead
+            # of ~15 chars of JSON text, and no nested-list walk to encode
+            msg['inputs_arr'] = netproto.encode_array(inputs)
+            msg['outputs_arr'] = netproto.encode_array(outputs)
+        else:
+            msg['inputs'] = inputs
+            msg['outputs'] = outputs
         
         try:
             log(f"Sending SUB_TRAIN to peer {host}:{port}, chunk {chunk_id}, {len(inputs)} samples")
-            
-            with socket.create_connection((host, port), timeout=180) as s:
-                s.sendall((json.dumps(msg) + '\n').encode('utf-8'))
-                
-                # Wait for response
-                response_data = b''
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk:
-                        break
-                    response_data += chunk
-                    if b'\n' in chunk:
-                        break
-                
-                resp = json.loads(response_data.decode('utf-8').strip())
-                
+
+            # framed + msgpack/orjson via netproto: both sides know exactly
+            # how many bytes to move, no newline scanning or 1MB cap, and
+            # the peer's model bytes come back without base64 under msgpack
+            with netproto.connect(host, port, timeout=180) as s:
+                netproto.send_msg(s, msg)
+                resp = netproto.recv_msg(s)
+
                 if resp.get('status') == 'OK':
-                    model_path = resp.get('model_path')
-                    log(f"Peer {host}:{port} completed chunk {chunk_id}, model: {model_path}")
-                    
-                    with lock:
-                        results_list.append(model_path)
+                    # the peer ships the trained model back inline (its
+                    # filesystem path only exists on the peer)
+                    data = resp.get('model_data')
+                    if data is None and resp.get('model_b64') is not None:
+                        data = base64.b64decode(resp['model_b64'])
+                    if data is None:
+                        log(f"Peer {host}:{port} chunk {chunk_id} returned no model data")
+                        return None
+                    fname = os.path.basename(resp.get('model_path', f'model_peer_chunk{chunk_id}.bin'))
+                    local_path = os.path.join(self.models_dir, fname)
+                    with open(local_path, 'wb') as f:
+                        f.write(data)
+                    samples = resp.get('samples', len(inputs))
+                    log(f"Peer {host}:{port} completed chunk {chunk_id}, model: {local_path}")
+                    return (local_path, samples)
                 else:
                     log(f"Peer {host}:{port} chunk {chunk_id} failed: {resp}")
-                    
+
         except Exception as e:
             log(f"Error sending SUB_TRAIN to peer {host}:{port}: {e}")
+        return None
 
-    def _aggregate_train(self, inputs, outputs):
+    def _average_models(self, partials):
         """
-        Aggregate distributed training results.
-        
-        Simple approach: Train a final model with ALL data.
-        (More sophisticated: average weights from partial models)
+        Aggregate partial chunk models into the final model by sample-weighted
+        weight averaging (FedAvg) on the Java side.
+
+        `partials` is a list of (model_path, samples). Returns
+        (model_id, model_path) or (None, None) when averaging is unavailable.
         """
-        log(f"Aggregating: Training final model with all {len(inputs)} samples")
-        return self._single_node_train(inputs, outputs)
+        final_id = secrets.token_hex(4)
+        final_path = os.path.join(self.models_dir, f'model_{final_id}.bin')
+
+        args = []
+        for path, samples in partials:
+            args.append(path)
+            args.append(str(samples))
+
+        if JAVA_ENGINE is not None:
+            resp = JAVA_ENGINE.call('AVERAGE', final_path, *args)
+            if resp and resp[0] == 'OK' and len(resp) > 1:
+                return (resp[1], final_path)
+            if resp:
+                log(f"Java daemon averaging failed: {resp}")
+
+        # One-shot path: daemon unavailable
+        try:
+            cmd = ['java', '-cp', JAVA_DIR, 'TrainingModule', 'average', final_path] + args
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+            for line in result.stdout.split('\n'):
+                if line.startswith('MODEL_ID:'):
+                    return (line[len('MODEL_ID:'):].strip(), final_path)
+        except Exception as e:
+            log(f"Model averaging error: {e}")
+        return (None, None)
 
     def _single_node_train(self, inputs, outputs):
         """Train a model on a single node (original behavior).
         Returns tuple (model_id, model_path) or (None, None) on failure.
         """
-        os.makedirs(self.models_dir, exist_ok=True)
-        
-        train_id = str(uuid.uuid4())[:8]
-        inputs_file = os.path.join(self.models_dir, f'inputs_{train_id}.csv')
-        outputs_file = os.path.join(self.models_dir, f'outputs_{train_id}.csv')
+        train_id = secrets.token_hex(4)
+        tmp_dir = TMP_TRAIN_DIR or self.models_dir
+        inputs_file = os.path.join(tmp_dir, f'inputs_{train_id}.csv')
+        outputs_file = os.path.join(tmp_dir, f'outputs_{train_id}.csv')
         model_path = os.path.join(self.models_dir, f'model_{train_id}.bin')
 
-        # Write CSV files
-        with open(inputs_file, 'w') as f:
-            for row in inputs:
-                f.write(','.join(str(x) for x in row) + '\n')
+        # Binary fast path: pipe the samples straight to the Java daemon
+        if JAVA_ENGINE is not None:
+            model_id = JAVA_ENGINE.train_data(inputs, outputs, 1000, model_path)
+            if model_id:
+                return (model_id, model_path)
 
-        with open(outputs_file, 'w') as f:
-            for row in outputs:
-                if isinstance(row, list):
-                    f.write(','.join(str(x) for x in row) + '\n')
-                else:
-                    f.write(str(row) + '\n')
+        # Write CSV files (legacy path when the daemon is unavailable)
+        write_csv(inputs_file, inputs)
+        write_csv(outputs_file, outputs)
 
         log(f"Training data saved: {inputs_file}, {outputs_file}")
 
@@ -436,13 +842,12 @@ class WorkerTCPHandler(threading.Thread):
         
         This is called by peers when leader distributes training.
         """
-        inputs = msg.get('inputs', [])
-        outputs = msg.get('outputs', [])
+        inputs, outputs = self._extract_training_data(msg)
         chunk_id = msg.get('chunk_id', 0)
 
         log(f"SUB_TRAIN request from {self.addr}: chunk {chunk_id}, {len(inputs)} samples")
 
-        if not inputs or not outputs:
+        if len(inputs) == 0 or len(outputs) == 0:
             self._send_response({'status': 'ERROR', 'message': 'Missing inputs or outputs'})
             return
 
@@ -450,11 +855,24 @@ class WorkerTCPHandler(threading.Thread):
         model_path = self._train_chunk(inputs, outputs, chunk_id)
 
         if model_path:
-            self._send_response({
+            # ship the model bytes back: the leader needs them for weight
+            # averaging, and this path only exists on this node
+            resp = {
                 'status': 'OK',
                 'model_path': model_path,
-                'chunk_id': chunk_id
-            })
+                'chunk_id': chunk_id,
+                'samples': len(inputs)
+            }
+            try:
+                with open(model_path, 'rb') as f:
+                    data = f.read()
+                if self.framed and netproto.msgpack is not None:
+                    resp['model_data'] = data
+                else:
+                    resp['model_b64'] = base64.b64encode(data).decode('ascii')
+            except OSError as e:
+                log(f"Could not read chunk model for transfer: {e}")
+            self._send_response(resp)
         else:
             self._send_response({
                 'status': 'ERROR',
@@ -462,7 +880,15 @@ class WorkerTCPHandler(threading.Thread):
             })
 
     def _run_java_training(self, inputs_file, outputs_file, model_path):
-        """Run Java TrainingModule and return model ID."""
+        """Run Java training (persistent daemon first) and return model ID."""
+        if JAVA_ENGINE is not None:
+            resp = JAVA_ENGINE.call('TRAIN', inputs_file, outputs_file, 1000, model_path)
+            if resp and resp[0] == 'OK' and len(resp) > 1:
+                return resp[1]
+            if resp:
+                log(f"Java daemon training failed: {resp}")
+
+        # One-shot path: daemon unavailable (e.g. TrainingDaemon not compiled)
         try:
             cmd = [
                 'java', '-cp', JAVA_DIR, 'TrainingModule',
@@ -473,16 +899,31 @@ class WorkerTCPHandler(threading.Thread):
             p = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
+                stderr=subprocess.STDOUT
             )
 
+            # read stdout in 64KiB chunks: one log call and one MODEL_ID scan
+            # per chunk instead of a Python iteration (and log write) per line
             model_id = None
-            for line in p.stdout:
-                line = line.strip()
-                log(f"JAVA: {line}")
-                if line.startswith('MODEL_ID:'):
-                    model_id = line.split(':', 1)[1]
+            fd = p.stdout.fileno()
+            buf = b''
+            while True:
+                data = os.read(fd, 1 << 16)
+                if not data:
+                    break
+                buf += data
+                *lines, buf = buf.split(b'\n')
+                if lines:
+                    text = b'\n'.join(lines).decode('utf-8', errors='replace')
+                    log('JAVA: ' + text.replace('\n', '\nJAVA: '))
+                    pos = text.rfind('MODEL_ID:')
+                    if pos != -1:
+                        model_id = text[pos + len('MODEL_ID:'):].split('\n', 1)[0].strip()
+            tail = buf.decode('utf-8', errors='replace').strip()
+            if tail:
+                log(f"JAVA: {tail}")
+                if tail.startswith('MODEL_ID:'):
+                    model_id = tail.split(':', 1)[1]
 
             p.wait()
             log(f"Java training finished (exit {p.returncode})")
@@ -490,21 +931,20 @@ class WorkerTCPHandler(threading.Thread):
             # If Java succeeded and returned a MODEL_ID, use it
             if p.returncode == 0 and model_id:
                 return model_id
-
-            # Fallback: if Java failed or didn't provide MODEL_ID, create a dummy model file
-            try:
-                fallback_id = f"fallback_{uuid.uuid4().hex[:8]}"
-                os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
-                with open(model_path, 'wb') as mf:
-                    mf.write(f"MODEL:{fallback_id}".encode('utf-8'))
-                log(f"Fallback model created at {model_path} with id={fallback_id}")
-                return fallback_id
-            except Exception as e:
-                log(f"Fallback model creation failed: {e}")
-                return None
-
         except Exception as e:
             log(f"Java training error: {e}")
+
+        # Fallback: no JVM or Java failed; create a dummy model file so the
+        # rest of the distributed pipeline still works
+        try:
+            fallback_id = f"fallback_{secrets.token_hex(4)}"
+            os.makedirs(os.path.dirname(model_path) or '.', exist_ok=True)
+            with open(model_path, 'wb') as mf:
+                mf.write(f"MODEL:{fallback_id}".encode('utf-8'))
+            log(f"Fallback model created at {model_path} with id={fallback_id}")
+            return fallback_id
+        except Exception as e:
+            log(f"Fallback model creation failed: {e}")
             return None
 
     def _handle_predict(self, msg):
@@ -524,40 +964,69 @@ class WorkerTCPHandler(threading.Thread):
             self._send_response({'status': 'ERROR', 'message': f'Model not found: {model_id}'})
             return
 
-        # Run Java prediction
+        # Run Java prediction (persistent daemon first, one-shot fallback)
         try:
             input_str = ','.join(str(x) for x in input_data)
-            cmd = ['java', '-cp', JAVA_DIR, 'TrainingModule', 'predict', model_path, input_str]
-            log(f"Running: {' '.join(cmd)}")
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
             output = None
-            for line in result.stdout.split('\n'):
-                if line.startswith('PREDICTION:'):
-                    pred_str = line.split(':', 1)[1]
-                    output = [float(x) for x in pred_str.split(',')]
-                    break
+
+            if JAVA_ENGINE is not None:
+                resp = JAVA_ENGINE.call('PREDICT', model_path, input_str)
+                if resp and resp[0] == 'OK' and len(resp) > 1:
+                    output = parse_float_csv(resp[1])
+                elif resp:
+                    log(f"Java daemon predict failed: {resp}")
+
+            if output is None:
+                cmd = ['java', '-cp', JAVA_DIR, 'TrainingModule', 'predict', model_path, input_str]
+                log(f"Running: {' '.join(cmd)}")
+
+                # stream stdout and stop at the PREDICTION line: memory stays
+                # capped at one line and the process is reaped as soon as the
+                # answer is out, instead of buffering the whole output first
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+                try:
+                    for raw in proc.stdout:
+                        if raw.startswith(b'PREDICTION:'):
+                            pred_str = raw[len(b'PREDICTION:'):].decode('ascii')
+                            output = parse_float_csv(pred_str)
+                            break
+                finally:
+                    proc.stdout.close()
+                    proc.kill()
+                    proc.wait(timeout=30)
 
             if output is not None:
                 self._send_response({'status': 'OK', 'output': output})
             else:
-                log(f"Prediction failed: {result.stdout} {result.stderr}")
+                log("Prediction failed: no PREDICTION line in java output")
                 self._send_response({'status': 'ERROR', 'message': 'Prediction failed'})
 
+
         except Exception as e:
             log(f"Predict error: {e}")
             self._send_response({'status': 'ERROR', 'message': str(e)})
 
     def _find_model(self, model_id):
-        """Find model file by ID (partial match supported)."""
-        # Look for exact match first
+        """Find model file by ID (partial match supported).
+
+        Served from the in-memory index; the glob scan only runs on an
+        index miss (e.g. a file dropped into the directory by hand) and
+        its result is indexed for next time."""
+        with MODEL_INDEX_LOCK:
+            path = MODEL_INDEX.get(model_id)
+            if path is None:
+                path = next((p for mid, p in MODEL_INDEX.items() if model_id in mid), None)
+        if path and os.path.exists(path):
+            return path
+
         for pattern in [
             os.path.join(self.models_dir, f'model_{model_id}.bin'),
             os.path.join(self.models_dir, f'*{model_id}*.bin'),
         ]:
             matches = glob.glob(pattern)
             if matches:
+                index_model(model_id, matches[0])
                 return matches[0]
         return None
 
@@ -565,16 +1034,20 @@ class WorkerTCPHandler(threading.Thread):
         """Handle LIST_MODELS request."""
         log(f"LIST_MODELS request from {self.addr}")
         
+        # one scandir pass; startswith/endswith beat fnmatch + regex here
         models = []
-        pattern = os.path.join(self.models_dir, '*.bin')
-        for path in glob.glob(pattern):
-            fname = os.path.basename(path)
-            # Extract model ID from filename
-            match = re.search(r'model_(.+)\.bin', fname)
-            if match:
-                models.append(match.group(1))
-            else:
-                models.append(fname)
+        try:
+            with os.scandir(self.models_dir) as it:
+                for de in it:
+                    name = de.name
+                    if not name.endswith('.bin'):
+                        continue
+                    if name.startswith('model_'):
+                        models.append(name[6:-4])
+                    else:
+                        models.append(name)
+        except FileNotFoundError:
+            pass
 
         self._send_response({'status': 'OK', 'models': models})
 
@@ -587,21 +1060,29 @@ class WorkerTCPHandler(threading.Thread):
             size = header_obj.get('size', 0)
             log(f"Legacy PUT {fname} size={size} from {self.addr}")
 
-            received = b''
-            while len(received) < size:
-                chunk = self.conn.recv(min(4096, size - len(received)))
-                if not chunk:
+            # preallocate once and recv_into: O(N) bytes moved instead of
+            # the O(N^2) reallocation of repeated `received += chunk`
+            buf = bytearray(size)
+            view = memoryview(buf)
+            pos = 0
+            while pos < size:
+                n = self.conn.recv_into(view[pos:], min(1 << 16, size - pos))
+                if not n:
                     break
-                received += chunk
+                pos += n
+            received = bytes(view[:pos]) if pos != size else bytes(buf)
 
-            entry = {'filename': fname, 'data_b64': base64.b64encode(received).decode('ascii')}
+            if netproto.msgpack is not None:
+                # same raw-bytes entry as the framed PUT path: skips the
+                # base64 encode here plus the decode on every follower
+                entry = {'filename': fname, 'data': received}
+            else:
+                entry = {'filename': fname, 'data_b64': base64.b64encode(received).decode('ascii')}
             try:
-                success = raft_node.replicate(entry)
+                success = self.raft_node.replicate(entry)
                 if success:
-                    os.makedirs(self.storage_dir, exist_ok=True)
-                    path = os.path.join(self.storage_dir, fname)
-                    with open(path, 'wb') as f:
-                        f.write(received)
+                    path = self.storage_prefix + fname
+                    write_file_bytes(path, received)
                     log(f"Committed and stored {path}")
                     self._send_response({'status': 'OK'})
                 else:
@@ -612,85 +1093,120 @@ class WorkerTCPHandler(threading.Thread):
             log(f"Legacy PUT error: {e}")
 
 
-def start_tcp_server(bind_host: str, bind_port: int, storage_dir: str, models_dir: str, raft_node, peers_info):
-    log(f"Starting worker TCP server on {bind_host}:{bind_port}")
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind((bind_host, bind_port))
-        s.listen()
-        while True:
-            conn, addr = s.accept()
-            t = WorkerTCPHandler(conn, addr, storage_dir, models_dir, raft_node, peers_info)
-            t.start()
+def _run_handler(handler, gate):
+    try:
+        handler.handle()
+    finally:
+        gate.release()
 
 
-class MonitorHandler(http.server.SimpleHTTPRequestHandler):
-    def log_message(self, format, *args):
-        pass  # Suppress default logging
+def _accept_loop(s, addr_of, storage_dir, models_dir, raft_node, peers_info, pool, gate):
+    """Feed accepted connections into the shared handler pool."""
+    while True:
+        conn, addr = s.accept()
+        try:
+            # small request/response pairs must not sit out Nagle's delay
+            # (no-op for AF_UNIX connections)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            pass
+        if not gate.acquire(blocking=False):
+            # at capacity: shed the connection rather than queue unbounded
+            log(f"Connection from {addr_of(addr)} rejected: at capacity")
+            try:
+                conn.close()
+            except OSError:
+                pass
+            continue
+        handler = WorkerTCPHandler(conn, addr_of(addr), storage_dir, models_dir, raft_node, peers_info)
+        pool.submit(_run_handler, handler, gate)
 
-    def do_GET(self):
-        if self.path == '/logs':
-            self._serve_logs()
-        elif self.path == '/status':
-            self._serve_status()
-        elif self.path == '/models':
-            self._serve_models()
-        elif self.path == '/':
-            self._serve_dashboard()
-        else:
-            self.send_error(404)
 
-    def _serve_logs(self):
-        self.send_response(200)
-        self.send_header('Content-Type', 'text/plain; charset=utf-8')
-        self.end_headers()
-        try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
-                self.wfile.write(f.read().encode('utf-8'))
-        except FileNotFoundError:
-            self.wfile.write(b'No logs yet')
+def start_uds_server(bind_port: int, storage_dir: str, models_dir: str, raft_node, peers_info, pool, gate):
+    """Accept local clients over an AF_UNIX socket (same framed protocol).
 
-    def _serve_status(self):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        status = {
-            'state': raft_node.state,
-            'term': raft_node.current_term,
-            'leader': raft_node.leader,
-            'log_length': len(raft_node.log),
-            'commit_index': raft_node.commit_index
-        }
-        self.wfile.write(json.dumps(status, indent=2).encode('utf-8'))
+    Localhost clients that find the socket use it instead of loopback TCP,
+    which saves a kernel buffer copy and per-segment overhead on large
+    uploads."""
+    path = netproto.uds_path(bind_port)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    log(f"Starting worker UDS server on {path}")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.bind(path)
+        s.listen(socket.SOMAXCONN)
+        _accept_loop(s, lambda a: ('unix', path), storage_dir, models_dir,
+                     raft_node, peers_info, pool, gate)
 
-    def _serve_models(self):
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        models = []
-        pattern = os.path.join(MODELS_DIR, '*.bin')
-        for path in glob.glob(pattern):
-            models.append(os.path.basename(path))
-        self.wfile.write(json.dumps({'models': models}, indent=2).encode('utf-8'))
 
-    def _serve_dashboard(self):
-        self.send_response(200)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
-        self.end_headers()
-        html = f'''<!DOCTYPE html>
+def start_tcp_server(bind_host: str, bind_port: int, storage_dir: str, models_dir: str, raft_node, peers_info):
+    log(f"Starting worker TCP server on {bind_host}:{bind_port} "
+        f"(pool={HANDLER_POOL_SIZE}, admission={HANDLER_BACKLOG})")
+    # one bounded pool shared by the TCP and UDS listeners: no per-connection
+    # thread creation, and the semaphore sheds load beyond the backlog
+    pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=HANDLER_POOL_SIZE, thread_name_prefix='handler')
+    gate = threading.Semaphore(HANDLER_BACKLOG)
+    if hasattr(socket, 'AF_UNIX'):
+        threading.Thread(
+            target=start_uds_server,
+            args=(bind_port, storage_dir, models_dir, raft_node, peers_info, pool, gate),
+            daemon=True
+        ).start()
+    # with SO_REUSEPORT the kernel load-balances incoming connections over
+    # several listener sockets, so accept() itself is no longer a single
+    # thread's bottleneck under connect bursts
+    shards = min(4, os.cpu_count() or 1) if hasattr(socket, 'SO_REUSEPORT') else 1
+    for _ in range(shards - 1):
+        threading.Thread(
+            target=_tcp_accept_shard,
+            args=(bind_host, bind_port, shards > 1, storage_dir, models_dir,
+                  raft_node, peers_info, pool, gate),
+            daemon=True
+        ).start()
+    _tcp_accept_shard(bind_host, bind_port, shards > 1, storage_dir, models_dir,
+                      raft_node, peers_info, pool, gate)
+
+
+def _tcp_accept_shard(bind_host, bind_port, reuseport, storage_dir, models_dir,
+                      raft_node, peers_info, pool, gate):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuseport:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        # accepted sockets inherit these: 1 MiB buffers let a file upload or
+        # bulk response move in large chunks instead of many short writes
+        try:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        except OSError:
+            pass
+        s.bind((bind_host, bind_port))
+        # deep backlog so connection bursts wait in the kernel queue instead
+        # of seeing RSTs while the pool drains
+        s.listen(socket.SOMAXCONN)
+        _accept_loop(s, lambda a: a, storage_dir, models_dir,
+                     raft_node, peers_info, pool, gate)
+
+
+# the dashboard page is static: render it to bytes once at import so
+# each request is a header + one sendall of a prebuilt buffer
+DASHBOARD_HTML = '''<!DOCTYPE html>
 <html>
 <head>
     <title>Worker Monitor (DISTRIBUTED)</title>
     <style>
-        body {{ font-family: monospace; background: #1a1a2e; color: #eee; padding: 20px; }}
-        h1 {{ color: #00d4ff; }}
-        .card {{ background: #16213e; padding: 15px; margin: 10px 0; border-radius: 8px; }}
-        .label {{ color: #888; }}
-        .leader {{ color: #00ff88; }}
-        .follower {{ color: #ffaa00; }}
-        .candidate {{ color: #ff6b6b; }}
-        .badge {{ background: #ff4444; color: white; padding: 2px 8px; border-radius: 4px; }}
-        pre {{ background: #0f0f23; padding: 10px; overflow-x: auto; max-height: 400px; }}
+        body { font-family: monospace; background: #1a1a2e; color: #eee; padding: 20px; }
+        h1 { color: #00d4ff; }
+        .card { background: #16213e; padding: 15px; margin: 10px 0; border-radius: 8px; }
+        .label { color: #888; }
+        .leader { color: #00ff88; }
+        .follower { color: #ffaa00; }
+        .candidate { color: #ff6b6b; }
+        .badge { background: #ff4444; color: white; padding: 2px 8px; border-radius: 4px; }
+        pre { background: #0f0f23; padding: 10px; overflow-x: auto; max-height: 400px; }
     </style>
 </head>
 <body>
@@ -708,36 +1224,161 @@ class MonitorHandler(http.server.SimpleHTTPRequestHandler):
         <pre id="logs">Loading...</pre>
     </div>
     <script>
-        async function refresh() {{
-            try {{
+        async function refresh() {
+            try {
                 const status = await fetch('/status').then(r => r.json());
                 const stateClass = status.state;
                 document.getElementById('status').innerHTML = `
-                    <span class="${{stateClass}}">${{status.state.toUpperCase()}}</span> | 
-                    Term: ${{status.term}} | Leader: ${{JSON.stringify(status.leader)}} |
-                    Log: ${{status.log_length}} entries | Commit: ${{status.commit_index}}
+                    <span class="${stateClass}">${status.state.toUpperCase()}</span> | 
+                    Term: ${status.term} | Leader: ${JSON.stringify(status.leader)} |
+                    Log: ${status.log_length} entries | Commit: ${status.commit_index}
                 `;
-            }} catch(e) {{ document.getElementById('status').textContent = 'Error'; }}
+            } catch(e) { document.getElementById('status').textContent = 'Error'; }
 
-            try {{
+            try {
                 const models = await fetch('/models').then(r => r.json());
                 document.getElementById('models').innerHTML = models.models.length 
-                    ? models.models.map(m => `<div>📦 ${{m}}</div>`).join('')
+                    ? models.models.map(m => `<div>📦 ${m}</div>`).join('')
                     : '<em>No models yet</em>';
-            }} catch(e) {{ document.getElementById('models').textContent = 'Error'; }}
+            } catch(e) { document.getElementById('models').textContent = 'Error'; }
 
-            try {{
+            try {
                 const logs = await fetch('/logs').then(r => r.text());
                 const lines = logs.split('\\n').slice(-50).join('\\n');
                 document.getElementById('logs').textContent = lines || 'No logs';
-            }} catch(e) {{ document.getElementById('logs').textContent = 'Error'; }}
-        }}
+            } catch(e) { document.getElementById('logs').textContent = 'Error'; }
+        }
         refresh();
         setInterval(refresh, 3000);
     </script>
 </body>
-</html>'''
-        self.wfile.write(html.encode('utf-8'))
+</html>'''.encode('utf-8')
+
+
+class MonitorHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass  # Suppress default logging
+
+    def do_GET(self):
+        handler = self._ROUTES.get(self.path)
+        if handler:
+            handler(self)
+        else:
+            self.send_error(404)
+
+    def _serve_logs(self):
+        # the dashboard only shows the last ~50 lines, so serve a bounded
+        # tail: memory use stays constant no matter how large the log grows
+        try:
+            f = open(LOG_FILE, 'rb')
+        except OSError:
+            data = b'No logs yet'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            # weak validator from size+mtime: pollers get a 304 with no body
+            # whenever nothing was logged since their last fetch
+            etag = '"%d-%d"' % (st.st_size, st.st_mtime_ns)
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            size = st.st_size
+            offset = max(0, size - 64 * 1024)
+            f.seek(offset)
+            if offset:
+                f.readline()  # drop the partial first line
+                offset = f.tell()
+            length = size - offset
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(length))
+            self.end_headers()
+            if hasattr(os, 'sendfile'):
+                # zero-copy file-to-socket: the tail never passes through
+                # Python buffers
+                self.wfile.flush()
+                sent = 0
+                while sent < length:
+                    n = os.sendfile(self.connection.fileno(), f.fileno(),
+                                    offset + sent, length - sent)
+                    if n == 0:
+                        break
+                    sent += n
+            else:
+                self.wfile.write(f.read(length))
+
+    # (state_version, serialized status) — dashboard tabs poll every 3s and
+    # the answer only changes when the RAFT node actually transitions
+    _status_cache = (-1, b'')
+
+    def _serve_status(self):
+        version = raft_node.state_version
+        cached_version, body = MonitorHandler._status_cache
+        if version != cached_version:
+            status = {
+                'state': raft_node.state,
+                'term': raft_node.current_term,
+                'leader': raft_node.leader,
+                'log_length': len(raft_node.log),
+                'commit_index': raft_node.commit_index
+            }
+            body = dumps_indented(status)
+            MonitorHandler._status_cache = (version, body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_models(self):
+        # list the directory like LIST_MODELS does (one cheap scandir pass)
+        # so the monitor agrees with the worker and shows files dropped in
+        # by hand, which the index only picks up lazily
+        models = []
+        try:
+            with os.scandir(MODELS_DIR) as it:
+                for de in it:
+                    if de.name.endswith('.bin'):
+                        models.append(de.name)
+        except FileNotFoundError:
+            pass
+        models.sort()
+        # the dashboard polls every 3s; a 304 saves re-serializing an
+        # unchanged model list
+        etag = '"%x"' % (hash(tuple(models)) & 0xFFFFFFFFFFFFFFFF)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = dumps_indented({'models': models})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_dashboard(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(DASHBOARD_HTML)))
+        self.end_headers()
+        self.wfile.write(DASHBOARD_HTML)
+
+    # path -> handler, resolved once instead of an if-chain per request
+    _ROUTES = {
+        '/logs': _serve_logs,
+        '/status': _serve_status,
+        '/models': _serve_models,
+        '/': _serve_dashboard,
+    }
 
 
 def start_monitor(bind_host: str, monitor_port: int):
@@ -776,6 +1417,16 @@ def main():
     os.makedirs(STORAGE_DIR, exist_ok=True)
     os.makedirs(MODELS_DIR, exist_ok=True)
 
+    # log appends go through a queue + background writer from here on
+    start_log_writer()
+
+    # one persistent JVM for all training/prediction on this worker
+    global JAVA_ENGINE
+    JAVA_ENGINE = JavaEngine(JAVA_DIR)
+
+    # one directory scan at boot; train/apply keep it up to date
+    load_model_index(MODELS_DIR)
+
     # Start RAFT node
     global raft_node
     raft_peers = []
@@ -791,35 +1442,41 @@ def main():
         # Handle explicit STORE_FILE entries
         if action == 'STORE_FILE':
             fname = command.get('filename')
-            data_b64 = command.get('data_b64')
-            if not fname or not data_b64:
+            data = command.get('data')
+            if data is None and command.get('data_b64') is not None:
+                data = base64.b64decode(command['data_b64'])
+            if not fname or data is None:
                 log('STORE_FILE missing filename or data')
                 return
             try:
-                data = base64.b64decode(data_b64)
-                os.makedirs(MODELS_DIR, exist_ok=True)
                 path = os.path.join(MODELS_DIR, fname)
-                with open(path, 'wb') as f:
-                    f.write(data)
+                write_file_bytes(path, data)
+                if fname.startswith('model_') and fname.endswith('.bin'):
+                    index_model(fname[6:-4], path)
+                meta = command.get('meta')
+                if isinstance(meta, dict) and meta.get('model_id'):
+                    index_model(meta['model_id'], path)
                 log(f"RAFT applied STORE_FILE: wrote {path}")
             except Exception as e:
                 log(f"Error applying STORE_FILE: {e}")
             return
 
-        # Handle legacy entries that only include filename + data_b64
-        if isinstance(command, dict) and 'filename' in command and 'data_b64' in command:
+        # Handle legacy entries that only include filename + data/data_b64
+        if isinstance(command, dict) and 'filename' in command and ('data' in command or 'data_b64' in command):
             try:
                 fname = command.get('filename')
-                data = base64.b64decode(command.get('data_b64'))
+                data = command.get('data')
+                if data is None:
+                    data = base64.b64decode(command['data_b64'])
                 # decide destination: models if filename looks like model_*.bin, otherwise storage
                 if fname.startswith('model_') or (isinstance(command.get('meta'), dict) and 'model_id' in command.get('meta')):
                     dest_dir = MODELS_DIR
                 else:
                     dest_dir = STORAGE_DIR
-                os.makedirs(dest_dir, exist_ok=True)
                 path = os.path.join(dest_dir, fname)
-                with open(path, 'wb') as f:
-                    f.write(data)
+                write_file_bytes(path, data)
+                if dest_dir == MODELS_DIR and fname.startswith('model_') and fname.endswith('.bin'):
+                    index_model(fname[6:-4], path)
                 log(f"RAFT applied legacy file: wrote {path}")
             except Exception as e:
                 log(f"Error applying legacy file entry: {e}")
@@ -849,6 +1506,11 @@ def main():
     mt = threading.Thread(target=start_monitor, args=(args.host, args.monitor_port), daemon=True)
     mt.start()
 
+    # startup is done: move everything allocated so far (modules, the RAFT
+    # node, handler pool) into the permanent generation so the cyclic GC
+    # stops rescanning it on every collection triggered by request churn
+    gc.freeze()
+
     # Start TCP server (blocking) - pass peers_info for distribution
     start_tcp_server(args.host, args.port, STORAGE_DIR, MODELS_DIR, raft_node, peers)
 
@@ -0,0 +1,55 @@
+from src.raft import RaftNode
+
+
+def _entry(term, i):
+    return {'term': term, 'command': {'filename': f'f{i}.txt', 'data_b64': 'eA=='}}
+
+
+def _node(tmp_path):
+    # the node is never start()ed: these tests drive _write_state directly
+    return RaftNode('n1', '127.0.0.1', 0, [], persistence_path=str(tmp_path))
+
+
+def test_journal_roundtrip(tmp_path):
+    node = _node(tmp_path)
+    node.log = [_entry(1, i) for i in range(5)]
+    node._write_state()
+
+    reloaded = _node(tmp_path)
+    assert reloaded.log == node.log
+    assert reloaded.current_term == node.current_term
+
+
+def test_journal_truncate_while_writer_lags(tmp_path):
+    # regression: a conflict truncation can point past the journaled tail
+    # when the background writer is lagging; the entries in between must
+    # still be appended, not skipped
+    node = _node(tmp_path)
+    node.log = [_entry(1, i) for i in range(5)]
+    node._write_state()  # journal holds entries 0..4
+
+    # the log grows to 10 entries but the writer has not caught up yet
+    node.log += [_entry(1, i) for i in range(5, 10)]
+
+    # a leader conflict invalidates the suffix from index 8 on
+    del node.log[8:]
+    node._persist_trunc = 8
+    node.log += [_entry(2, i) for i in range(8, 10)]
+    node._write_state()
+
+    reloaded = _node(tmp_path)
+    assert reloaded.log == node.log
+
+
+def test_journal_truncate_below_written_tail(tmp_path):
+    node = _node(tmp_path)
+    node.log = [_entry(1, i) for i in range(10)]
+    node._write_state()  # journal holds entries 0..9
+
+    del node.log[6:]
+    node._persist_trunc = 6
+    node.log += [_entry(3, i) for i in range(6, 8)]
+    node._write_state()
+
+    reloaded = _node(tmp_path)
+    assert reloaded.log == node.log